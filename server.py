@@ -1,9 +1,32 @@
 import os
+import sys
 import argparse
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import time
+import urllib.parse
+import email.utils
+from io import BytesIO
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Must match reload_stamp_name in src/watch.py, which `src/main.py --watch`
+# touches after every rebuild.
+RELOAD_STAMP = ".livereload"
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = (
+    f'<script>new EventSource("{RELOAD_PATH}").onmessage = () => location.reload();</script>'
+).encode()
+# Precompressed sibling files, in order of preference, served when the client
+# accepts their Content-Encoding.
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
 
 
 class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive between requests; every response
+    # therefore carries a Content-Length or closes the connection.
+    protocol_version = "HTTP/1.1"
+    live_reload = False
+    max_age = 0
+
     def end_headers(self):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
@@ -12,29 +35,239 @@ class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
 
     def do_OPTIONS(self):
         self.send_response(200, "OK")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.live_reload and self.path == RELOAD_PATH:
+            self.send_reload_events()
+            return
+        super().do_GET()
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path) or path.endswith("/"):
+            # Directory redirects, listings and errors.
+            return super().send_head()
+        if self.live_reload and path.endswith(".html"):
+            return self.send_html_with_reload_script(path)
+        return self.send_file(path)
+
+    def send_file(self, path):
+        """Serves a file with validators and caching headers, answering
+        conditional requests with 304 and preferring a precompressed sibling
+        when the client accepts its encoding."""
+        encoding, served_path = self.choose_encoding(path)
+        stat = os.stat(served_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if self.is_not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_cache_headers(etag, stat.st_mtime)
+            self.end_headers()
+            return None
+
+        file = open(served_path, "rb")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(stat.st_size))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_cache_headers(etag, stat.st_mtime)
+        self.end_headers()
+        return file
+
+    def send_cache_headers(self, etag, mtime):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.date_time_string(mtime))
+        if self.max_age:
+            self.send_header("Cache-Control", f"public, max-age={self.max_age}")
+        else:
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def choose_encoding(self, path):
+        accepted = set()
+        for item in self.headers.get("Accept-Encoding", "").split(","):
+            coding, _, params = item.strip().partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(coding.strip().lower())
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                # A sidecar older than its file is stale, e.g. after a watch rebuild.
+                if os.stat(path + suffix).st_mtime_ns >= os.stat(path).st_mtime_ns:
+                    return encoding, path + suffix
+            except FileNotFoundError:
+                continue
+        return None, path
+
+    def is_not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None and mtime is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since.timestamp()
+        return False
+
+    def send_html_with_reload_script(self, path):
+        """Serves an HTML file with the live-reload client injected before </body>."""
+        with open(path, "rb") as html_file:
+            body = html_file.read()
+        index = body.rfind(b"</body>")
+        if index == -1:
+            body += RELOAD_SCRIPT
+        else:
+            body = body[:index] + RELOAD_SCRIPT + body[index:]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
         self.end_headers()
+        return BytesIO(body)
+
+    def send_reload_events(self):
+        """Holds a server-sent events stream open and emits a reload event each
+        time the reload stamp changes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        last_stamp = self.reload_stamp()
+        last_write = time.monotonic()
+        try:
+            while True:
+                time.sleep(0.02)
+                stamp = self.reload_stamp()
+                if stamp != last_stamp:
+                    last_stamp = stamp
+                    self.wfile.write(b"data: reload\n\n")
+                    self.wfile.flush()
+                    last_write = time.monotonic()
+                elif time.monotonic() - last_write > 15:
+                    # Comment line keeping the connection alive and detecting
+                    # clients that went away.
+                    self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+                    last_write = time.monotonic()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def reload_stamp(self):
+        try:
+            return os.stat(os.path.join(self.directory, RELOAD_STAMP)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+class MemorySiteHandler(CORSHTTPRequestHandler):
+    """Answers requests from a MemorySite held in memory instead of from disk."""
+
+    site = None
+
+    def send_head(self):
+        parts = urllib.parse.urlsplit(self.path)
+        url = urllib.parse.unquote(parts.path)
+        entry = self.site.get(url)
+        if entry is None and self.site.directory_url(url) is not None:
+            # Redirect like the file server does for a directory without "/".
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header("Location", urllib.parse.urlunsplit(parts._replace(path=parts.path + "/")))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        if entry is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        if self.is_not_modified(entry.etag, None):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", entry.etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return None
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", entry.content_type)
+        self.send_header("Content-Length", str(len(entry.body)))
+        self.send_header("ETag", entry.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return BytesIO(entry.body)
 
 
 def run(
-    server_class=HTTPServer,
+    server_class=ThreadingHTTPServer,
     handler_class=CORSHTTPRequestHandler,
     port=8000,
     directory=None,
+    live_reload=False,
+    max_age=0,
 ):
     if directory:  # Change the current working directory if directory is specified
         os.chdir(directory)
+    handler_class.live_reload = live_reload
+    handler_class.max_age = max_age
     server_address = ("", port)
     httpd = server_class(server_address, handler_class)
     print(f"Serving HTTP on http://localhost:{port} from directory '{directory}'...")
     httpd.serve_forever()
 
 
+def run_memory(port=8000, content="content", template="template.html", static="static"):
+    """Renders the site into memory and serves it without an output directory."""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+    from memory_site import MemorySite
+
+    start = time.perf_counter()
+    MemorySiteHandler.site = MemorySite(content, template, static)
+    print(
+        f"Rendered {len(MemorySiteHandler.site.entries)} routes into memory "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    httpd = ThreadingHTTPServer(("", port), MemorySiteHandler)
+    print(f"Serving HTTP on http://localhost:{port} from memory...")
+    httpd.serve_forever()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="HTTP Server with CORS")
     parser.add_argument(
         "--dir", type=str, help="Directory to serve files from", default="."
     )
     parser.add_argument("--port", type=int, help="Port to serve HTTP on", default=8888)
+    parser.add_argument(
+        "--live-reload",
+        action="store_true",
+        help="Inject a live-reload client into HTML pages and notify it after rebuilds",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=int,
+        default=0,
+        help="Cache-Control max-age in seconds; 0 makes clients revalidate every request",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Render content/, template.html and static/ into memory and serve from there",
+    )
     args = parser.parse_args()
 
-    run(port=args.port, directory=args.dir)
+    if args.memory:
+        run_memory(port=args.port)
+    else:
+        run(
+            port=args.port,
+            directory=args.dir,
+            live_reload=args.live_reload,
+            max_age=args.max_age,
+        )
@@ -0,0 +1,191 @@
+import os
+import shutil
+import stat
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import build_log
+from manifest import hash_file
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# ioctl request cloning a file's extents on copy-on-write filesystems (Btrfs, XFS).
+FICLONE = 0x40049409
+
+link_modes = ("copy", "reflink", "hardlink")
+compare_modes = ("stat", "hash")
+
+
+def sync_assets(
+    src_dir: Path,
+    dst_dir: Path,
+    previous: dict = None,
+    workers: int = None,
+    link_mode: str = "reflink",
+    compare: str = "stat",
+) -> dict[str, list[int]]:
+    """
+    Publishes a static asset tree into the output directory, copying only
+    files that changed and deleting assets that no longer exist in the source.
+
+    Args:
+        src_dir: The static asset directory.
+        dst_dir: The output directory.
+        previous: The asset records returned by the previous sync. Assets listed
+            there but missing from src_dir are deleted from dst_dir; other files
+            in dst_dir, such as generated pages, are never touched.
+        workers: Number of copy threads. Defaults to the ThreadPoolExecutor default.
+        link_mode: "copy" copies file data, "reflink" clones it on filesystems
+            that support it and "hardlink" links the output to the source. Both
+            fall back to copying when the filesystem refuses.
+        compare: "stat" treats a file as unchanged when size and modification
+            time match, "hash" also compares the file contents.
+
+    Returns:
+        A mapping of each asset path, relative to src_dir, to its [size, mtime_ns].
+    """
+    if link_mode not in link_modes:
+        raise ValueError(f"Invalid link mode: {link_mode}")
+    if compare not in compare_modes:
+        raise ValueError(f"Invalid compare mode: {compare}")
+
+    src_dir = Path(src_dir)
+    dst_dir = Path(dst_dir)
+    records = {}
+    pending = []
+    for dir_path, _, file_names in os.walk(src_dir):
+        for file_name in file_names:
+            src_path = Path(dir_path, file_name)
+            relative = src_path.relative_to(src_dir).as_posix()
+            src_stat = src_path.stat()
+            records[relative] = [src_stat.st_size, src_stat.st_mtime_ns]
+            dst_path = dst_dir / relative
+            if not _is_unchanged(src_path, src_stat, dst_path, compare):
+                pending.append((src_path, dst_path))
+
+    copier = _Copier(link_mode)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Consume the results so a failed copy raises here.
+        list(executor.map(lambda paths: copier.copy(*paths), pending))
+
+    removed = 0
+    for relative in (previous or {}).keys() - records.keys():
+        dst_path = dst_dir / relative
+        if dst_path.is_file():
+            dst_path.unlink()
+            removed += 1
+            _remove_empty_dirs(dst_path.parent, dst_dir)
+
+    build_log.info(
+        f"Synced {src_dir} to {dst_dir}: {len(pending)} copied, "
+        f"{len(records) - len(pending)} unchanged, {removed} removed"
+    )
+    return records
+
+
+def sync_asset_files(
+    src_dir: Path,
+    dst_dir: Path,
+    paths: Iterable[Path],
+    records: dict,
+    link_mode: str = "reflink",
+    compare: str = "stat",
+) -> int:
+    """
+    Publishes individual assets that changed, such as those reported by a
+    file watcher, the way sync_assets publishes the whole tree but without
+    walking it.
+
+    Args:
+        src_dir: The static asset directory.
+        dst_dir: The output directory.
+        paths: Changed, added or deleted files under src_dir.
+        records: The asset records returned by sync_assets, updated in place.
+            A deleted asset is only removed from dst_dir if it is recorded.
+        link_mode: How files are published, as for sync_assets.
+        compare: How unchanged files are detected, as for sync_assets.
+
+    Returns:
+        The number of assets copied.
+    """
+    if link_mode not in link_modes:
+        raise ValueError(f"Invalid link mode: {link_mode}")
+    if compare not in compare_modes:
+        raise ValueError(f"Invalid compare mode: {compare}")
+
+    src_dir = Path(src_dir)
+    dst_dir = Path(dst_dir)
+    copier = _Copier(link_mode)
+    copied = 0
+    for src_path in paths:
+        relative = Path(src_path).relative_to(src_dir).as_posix()
+        dst_path = dst_dir / relative
+        try:
+            src_stat = os.stat(src_path)
+        except FileNotFoundError:
+            if records.pop(relative, None) is not None and dst_path.is_file():
+                dst_path.unlink()
+                _remove_empty_dirs(dst_path.parent, dst_dir)
+            continue
+        if not stat.S_ISREG(src_stat.st_mode):
+            continue
+        records[relative] = [src_stat.st_size, src_stat.st_mtime_ns]
+        if not _is_unchanged(src_path, src_stat, dst_path, compare):
+            copier.copy(Path(src_path), dst_path)
+            copied += 1
+    return copied
+
+
+def _is_unchanged(src_path: Path, src_stat: os.stat_result, dst_path: Path, compare: str) -> bool:
+    try:
+        dst_stat = dst_path.stat()
+    except FileNotFoundError:
+        return False
+    if dst_stat.st_size != src_stat.st_size:
+        return False
+    if compare == "hash":
+        return hash_file(src_path) == hash_file(dst_path)
+    return dst_stat.st_mtime_ns == src_stat.st_mtime_ns
+
+
+def _remove_empty_dirs(directory: Path, root: Path) -> None:
+    while directory != root and directory.is_relative_to(root):
+        try:
+            directory.rmdir()
+        except OSError:
+            return
+        directory = directory.parent
+
+
+class _Copier:
+    """Copies files using the requested link mode, falling back to a plain copy
+    once the filesystem reports that linking is unsupported."""
+
+    def __init__(self, link_mode: str) -> None:
+        self.link_mode = link_mode
+        if link_mode == "reflink" and fcntl is None:
+            self.link_mode = "copy"
+
+    def copy(self, src_path: Path, dst_path: Path) -> None:
+        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        if dst_path.exists() or dst_path.is_symlink():
+            dst_path.unlink()
+        if self.link_mode == "hardlink":
+            try:
+                os.link(src_path, dst_path)
+                return
+            except OSError:
+                self.link_mode = "copy"
+        elif self.link_mode == "reflink":
+            try:
+                with open(src_path, "rb") as src_file, open(dst_path, "wb") as dst_file:
+                    fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+                shutil.copystat(src_path, dst_path)
+                return
+            except OSError:
+                self.link_mode = "copy"
+        shutil.copy2(src_path, dst_path)
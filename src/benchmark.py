@@ -0,0 +1,308 @@
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from block_markdown import (
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+from inline_markdown import split_nodes_image, split_nodes_link, text_to_textnodes
+from main import generate_page_file, generate_pages_recursive
+from template import Template
+from textnode import TextNode, text_type_text
+
+
+def time_call(func, *args, repeat: int = 3) -> float:
+    """
+    Times a call, keeping the best of several runs.
+
+    Args:
+        func: The function to time.
+        *args: Arguments passed to func.
+        repeat: How many times to run func.
+
+    Returns:
+        The fastest run time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def links_paragraph(count: int) -> str:
+    """Builds a paragraph with count links and count images, all with repeated text."""
+    return " ".join(f"see [docs](/docs) and ![logo](/logo.png) #{i}" for i in range(count))
+
+
+def bench_link_splitting(counts: list[int]) -> None:
+    """
+    Times split_nodes_image followed by split_nodes_link on paragraphs with a
+    growing number of links. Linear scaling shows as a flat time per link.
+    """
+    print(f"{'links':>8} {'seconds':>10} {'us/link':>10}")
+    for count in counts:
+        nodes = [TextNode(links_paragraph(count), text_type_text)]
+        seconds = time_call(lambda: split_nodes_link(split_nodes_image(nodes)))
+        print(f"{count:>8} {seconds:>10.4f} {seconds / count * 1e6:>10.2f}")
+
+
+def large_document(size_bytes: int) -> str:
+    """Builds a synthetic markdown document of roughly size_bytes bytes."""
+    section = (
+        "## Section\n\n"
+        "Some **bold** and *italic* text with `code` and a [link](/page) here.\n"
+        "A second line of the same paragraph with an ![image](/images/a.png).\n\n"
+        "* first item\n* second **item**\n* third item\n\n"
+        "1. one\n2. two\n3. three\n\n"
+        "> quoted *text*\n> more quote\n\n"
+    )
+    return "# Title\n\n" + section * (size_bytes // len(section) + 1)
+
+
+def bench_memory(size_bytes: int) -> None:
+    """
+    Parses a large synthetic document into an HTMLNode tree and reports how
+    much the process peak RSS grew while the tree was built and held.
+    """
+    markdown = large_document(size_bytes)
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    node = markdown_to_html_node(markdown)
+    seconds = time.perf_counter() - start
+    rss_after_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        f"{len(markdown) / 1e6:.1f} MB markdown -> {len(node.children)} blocks in {seconds:.2f}s, "
+        f"peak RSS {rss_after_kb / 1024:.1f} MB (+{(rss_after_kb - rss_before_kb) / 1024:.1f} MB for the tree)"
+    )
+
+
+def bench_stream_memory(size_bytes: int) -> None:
+    """
+    Renders a large synthetic markdown file through the streaming page path
+    and reports the process peak RSS, which should stay flat as size grows.
+    """
+    section = large_document(64 * 1024)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = Path(tmp_dir, "changelog.md")
+        with source.open("w") as markdown_file:
+            for _ in range(size_bytes // len(section) + 1):
+                markdown_file.write(section)
+        template = Template("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+        output = Path(tmp_dir, "changelog.html")
+        start = time.perf_counter()
+        generate_page_file(source, output, template)
+        seconds = time.perf_counter() - start
+        markdown_mb = source.stat().st_size / 1e6
+        html_mb = output.stat().st_size / 1e6
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        f"{markdown_mb:.1f} MB markdown -> {html_mb:.1f} MB HTML streamed in {seconds:.2f}s, "
+        f"peak RSS {rss_kb / 1024:.1f} MB"
+    )
+
+
+def corpus_long_paragraphs(scale: float) -> str:
+    """Few blocks, each a very long paragraph of plain prose."""
+    sentence = "The road goes ever on and on, down from the door where it began. "
+    paragraph = sentence * int(400 * scale)
+    return "\n\n".join([paragraph] * 20)
+
+
+def corpus_inline_heavy(scale: float) -> str:
+    """Paragraphs dense with bold, italic, code, link and image spans."""
+    line = "A **bold** word, an *italic* one, some `code`, a [link](/x) and ![img](/i.png). "
+    paragraph = line * int(50 * scale)
+    return "\n\n".join([paragraph] * 40)
+
+
+def corpus_huge_lists(scale: float) -> str:
+    """Unordered and ordered lists with many items."""
+    count = int(5000 * scale)
+    unordered = "\n".join(f"* item number {i} with *emphasis*" for i in range(count))
+    ordered = "\n".join(f"{i}. step {i} uses `code`" for i in range(1, count + 1))
+    return f"{unordered}\n\n{ordered}"
+
+
+def corpus_code_blocks(scale: float) -> str:
+    """Many fenced code blocks separated by short paragraphs."""
+    block = "```\nfor ring in rings:\n    bind(ring)\n```\n\nSome text between blocks."
+    return "\n\n".join([block] * int(2000 * scale))
+
+
+def corpus_blank_lines(scale: float) -> str:
+    """Short paragraphs between long runs of blank and whitespace-only CRLF lines."""
+    blank = "\r\n" * 6 + "   \r\n" * 4 + "\t\r\n" * 2 + "\r\n" * 8
+    return blank.join(f"paragraph {i}" for i in range(int(20000 * scale)))
+
+
+corpora = {
+    "long_paragraphs": corpus_long_paragraphs,
+    "inline_heavy": corpus_inline_heavy,
+    "huge_lists": corpus_huge_lists,
+    "code_blocks": corpus_code_blocks,
+    "blank_lines": corpus_blank_lines,
+}
+
+
+def write_site(root: Path, pages: int) -> tuple[Path, Path]:
+    """
+    Writes a synthetic site of the given number of pages, spread over
+    directories of 100 pages each.
+
+    Returns:
+        The content directory and the template path.
+    """
+    content = root / "content"
+    page = large_document(2000)
+    for i in range(pages):
+        section = content / f"section{i // 100}"
+        section.mkdir(parents=True, exist_ok=True)
+        (section / f"page{i}.md").write_text(page.replace("# Title", f"# Page {i}", 1))
+    template = root / "template.html"
+    template.write_text("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+    return content, template
+
+
+def bench_stages(scale: float, repeat: int) -> dict[str, float]:
+    """
+    Times each pipeline stage separately on every corpus.
+
+    Returns:
+        A mapping of "corpus.stage" to the best time in seconds.
+    """
+    results = {}
+    for name, make_corpus in corpora.items():
+        markdown = make_corpus(scale)
+        blocks = markdown_to_blocks(markdown)
+        paragraphs = [block.replace("\n", " ") for block in blocks]
+        node = markdown_to_html_node(markdown)
+        results[f"{name}.markdown_to_blocks"] = time_call(markdown_to_blocks, markdown, repeat=repeat)
+        results[f"{name}.block_to_block_type"] = time_call(
+            lambda: [block_to_block_type(block) for block in blocks], repeat=repeat
+        )
+        results[f"{name}.text_to_textnodes"] = time_call(
+            lambda: [text_to_textnodes(text) for text in paragraphs], repeat=repeat
+        )
+        results[f"{name}.markdown_to_html_node"] = time_call(markdown_to_html_node, markdown, repeat=repeat)
+        results[f"{name}.to_html"] = time_call(node.to_html, repeat=repeat)
+    return results
+
+
+def bench_site(pages: int) -> dict[str, float]:
+    """
+    Times a full generate_pages_recursive build of a synthetic site.
+
+    Returns:
+        A mapping of "site.generate_pages_recursive" to the build time in seconds.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        content, template = write_site(root, pages)
+        start = time.perf_counter()
+        generate_pages_recursive(content, template, root / "public")
+        seconds = time.perf_counter() - start
+    return {f"site_{pages}.generate_pages_recursive": seconds}
+
+
+def compare_results(
+    results: dict[str, float],
+    baseline: dict[str, float],
+    threshold: float,
+    min_seconds: float = 0.001,
+) -> list[str]:
+    """
+    Compares benchmark results against a baseline.
+
+    Args:
+        results: The current results.
+        baseline: The baseline results.
+        threshold: Allowed slowdown as a fraction, e.g. 0.1 for 10%.
+        min_seconds: Benchmarks faster than this in both runs are too noisy
+            to flag as regressions.
+
+    Returns:
+        The names of benchmarks slower than the baseline by more than threshold.
+    """
+    regressions = []
+    print(f"{'benchmark':<45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        change = seconds / baseline[name] - 1 if baseline[name] else 0.0
+        regressed = change > threshold and max(seconds, baseline[name]) >= min_seconds
+        flag = " REGRESSION" if regressed else ""
+        print(f"{name:<45} {baseline[name]:>10.4f} {seconds:>10.4f} {change:>+8.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Markdown pipeline benchmarks")
+    parser.add_argument("--scale", type=float, default=1.0, help="Size multiplier for the corpora")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is kept")
+    parser.add_argument("--pages", type=int, default=10000, help="Pages in the synthetic site (0 skips it)")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against results JSON from an earlier run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown against the baseline before failing, as a fraction",
+    )
+    parser.add_argument(
+        "--links",
+        type=int,
+        nargs="+",
+        help="Run only the link splitting benchmark with these link counts per paragraph",
+    )
+    parser.add_argument(
+        "--memory",
+        type=float,
+        default=None,
+        help="Run only the memory benchmark on a synthetic document of this many MB",
+    )
+    parser.add_argument(
+        "--stream-memory",
+        type=float,
+        default=None,
+        help="Run only the streaming render benchmark on a synthetic file of this many MB",
+    )
+    args = parser.parse_args()
+    if args.memory is not None:
+        bench_memory(int(args.memory * 1e6))
+        sys.exit()
+    if args.stream_memory is not None:
+        bench_stream_memory(int(args.stream_memory * 1e6))
+        sys.exit()
+    if args.links:
+        bench_link_splitting(args.links)
+        sys.exit()
+
+    results = bench_stages(args.scale, args.repeat)
+    if args.pages:
+        results.update(bench_site(args.pages))
+    for name, seconds in results.items():
+        print(f"{name:<45} {seconds:>10.4f}s")
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        if compare_results(results, baseline, args.threshold):
+            sys.exit(1)
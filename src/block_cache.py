@@ -0,0 +1,86 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Iterable
+
+
+class BlockCache:
+    """
+    A size-limited LRU cache mapping the hash of a markdown block's text to its
+    rendered HTML, so blocks repeated across pages (footers, disclaimers,
+    shared code samples) are parsed once per build. The URLs of the block's
+    links and images are kept with the HTML, so a page's metadata can be
+    collected from cached blocks without parsing them again.
+
+    Args:
+        maxsize (int): The maximum number of blocks kept. The least recently
+            used block is evicted when the cache is full.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        if maxsize < 1:
+            raise ValueError("BlockCache maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(block: str) -> bytes:
+        """
+        Computes the cache key of a block. Keys are short digests so the cache
+        does not keep large block texts alive.
+
+        Args:
+            block: The markdown block text.
+
+        Returns:
+            The digest of the block text.
+        """
+        return hashlib.blake2b(block.encode(), digest_size=16).digest()
+
+    def get(self, block: str) -> tuple[str, tuple[str, ...], tuple[str, ...]]:
+        """
+        Looks up the rendered HTML of a block.
+
+        Args:
+            block: The markdown block text.
+
+        Returns:
+            The cached HTML and the URLs of the block's links and images, or
+            None if the block is not cached.
+        """
+        key = self.key(block)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, block: str, html: str, links: Iterable[str] = (), images: Iterable[str] = ()) -> None:
+        """
+        Stores the rendered HTML of a block, evicting the least recently used
+        block if the cache is full.
+
+        Args:
+            block: The markdown block text.
+            html: The rendered HTML of the block.
+            links: The URL of every link in the block, excluding images.
+            images: The URL of every image in the block.
+        """
+        key = self.key(block)
+        self._entries[key] = (html, tuple(links), tuple(images))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes every block, e.g. after something rendered into blocks changed."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"BlockCache(size={len(self)}/{self.maxsize}, hits={self.hits}, misses={self.misses})"
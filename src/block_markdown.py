@@ -1,7 +1,21 @@
-import re
+from collections.abc import Callable, Iterable, Iterator
+
+import profiling
+from block_cache import BlockCache
 from inline_markdown import text_to_textnodes
 from htmlnode import ParentNode, LeafNode
-from textnode import text_node_to_html_node
+from page_metadata import PageMetadata, split_front_matter, split_front_matter_lines
+from patterns import (
+    blank_lines_pattern,
+    heading_pattern,
+    ordered_list_item_pattern,
+    ordered_list_pattern,
+)
+from textnode import TextNode, text_node_to_html_node, text_type_image
+
+# Bump whenever a parser change alters the HTML rendered from the same
+# markdown, so page bodies cached by an older parser are not reused.
+PARSER_VERSION = 6
 
 # Block types
 block_type_paragraph = "paragraph"
@@ -12,26 +26,184 @@ block_type_unordered_list = "unordered_list"
 block_type_ordered_list = "ordered_list"
 
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
+def markdown_to_html_node(
+    markdown: str, cache: BlockCache = None, image_props: Callable[[str], dict[str, str]] = None
+) -> ParentNode:
     """Converts a markdown string to a HTML div node.
 
     Args:
         markdown (str): The markdown string to convert.
+        cache (BlockCache, optional): A cache of rendered blocks shared across
+            pages. Cached blocks are emitted as raw HTML leaf nodes.
+        image_props (Callable, optional): Looks up the extra attributes of
+            an image by its URL, e.g. images.image_props.
 
     Returns:
         ParentNode: A div ParentNode containing the HTML representation of the markdown.
     """
-    blocks = markdown_to_blocks(markdown)
+    return markdown_to_page(markdown, cache, image_props)[0]
+
+
+def markdown_to_page(
+    markdown: str, cache: BlockCache = None, image_props: Callable[[str], dict[str, str]] = None
+) -> tuple[ParentNode, PageMetadata]:
+    """Converts a markdown page to a HTML div node, collecting the page's
+    title, front matter, headings, links and images in the same pass over
+    its blocks. Links and images are read from the text nodes the blocks are
+    rendered from, or from the cache along with a cached block's HTML.
+
+    Args:
+        markdown (str): The markdown page, optionally starting with a front
+            matter header, which is not rendered.
+        cache (BlockCache, optional): A cache of rendered blocks shared across
+            pages. Cached blocks are emitted as raw HTML leaf nodes.
+        image_props (Callable, optional): Looks up the extra attributes of
+            an image by its URL, e.g. images.image_props.
+
+    Returns:
+        tuple: The div ParentNode and the PageMetadata of the page.
+    """
+    front_matter, markdown = split_front_matter(markdown)
+    metadata = PageMetadata(front_matter)
+    with profiling.stage("split"):
+        blocks = markdown_to_blocks(markdown)
     children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
-    return ParentNode("div", children)
+    with profiling.stage("tree"):
+        for block in blocks:
+            _collect_metadata(metadata, block)
+            if cache is None:
+                children.append(block_to_html_node(block, image_props, metadata))
+            else:
+                html, links, images = _cached_block(block, cache, image_props)
+                metadata.links.extend(links)
+                metadata.images.extend(images)
+                children.append(LeafNode(None, html))
+    return ParentNode("div", children), metadata
+
+
+def read_page_metadata(lines: Iterable[str]) -> PageMetadata:
+    """
+    Collects the metadata of a markdown page read line by line, without
+    rendering it. Only blocks that may hold a link or image are parsed.
+
+    Args:
+        lines: The lines of the page, such as an open text file.
+
+    Returns:
+        The PageMetadata of the page.
+    """
+    front_matter, lines = split_front_matter_lines(lines)
+    metadata = PageMetadata(front_matter)
+    for block in iter_blocks(lines):
+        _collect_metadata(metadata, block)
+        if "](" in block and not block.startswith("```"):
+            for text in block_to_inline_texts(block):
+                _collect_links(metadata, text_to_textnodes(text))
+    return metadata
+
+
+def _collect_metadata(metadata: PageMetadata, block: str) -> None:
+    # Counting separators instead of splitting keeps word counts nearly free;
+    # spaces are rarely doubled in prose, so the estimate is close.
+    metadata.words += block.count(" ") + block.count("\n") + 1
+    if block[0] == "#":
+        match = heading_pattern.match(block)
+        if match is not None:
+            level = match.end()
+            metadata.words -= 1
+            metadata.add_heading(level, block[level:].split("\n", 1)[0].strip())
+
+
+def _collect_links(metadata: PageMetadata, text_nodes: list[TextNode]) -> None:
+    for text_node in text_nodes:
+        # Only links and images carry a URL.
+        if text_node.url is not None:
+            if text_node.text_type == text_type_image:
+                metadata.images.append(text_node.url)
+            else:
+                metadata.links.append(text_node.url)
+
+
+class MarkdownStream:
+    """
+    Markdown blocks rendered lazily into a div. It stands in for the tree
+    returned by markdown_to_html_node wherever a node is streamed with
+    write_html, such as Template.write, but only one block's subtree exists
+    at a time, so memory does not grow with the document.
+
+    Args:
+        blocks (Iterable[str]): The markdown blocks, e.g. from iter_blocks.
+        cache (BlockCache, optional): A cache of rendered blocks shared across pages.
+        image_props (Callable, optional): Looks up the extra attributes of an
+            image by its URL, e.g. images.image_props.
+    """
+
+    __slots__ = ("blocks", "cache", "image_props")
+
+    def __init__(
+        self, blocks: Iterable[str], cache: BlockCache = None, image_props: Callable[[str], dict[str, str]] = None
+    ) -> None:
+        self.blocks = blocks
+        self.cache = cache
+        self.image_props = image_props
+
+    def write_html(self, stream) -> None:
+        stream.write("<div>")
+        for block in self.blocks:
+            if self.cache is None:
+                block_to_html_node(block, self.image_props).write_html(stream)
+            else:
+                stream.write(_cached_block(block, self.cache, self.image_props)[0])
+        stream.write("</div>")
+
+
+def _cached_block(
+    block: str, cache: BlockCache, image_props: Callable[[str], dict[str, str]]
+) -> tuple[str, tuple[str, ...], tuple[str, ...]]:
+    entry = cache.get(block)
+    if entry is None:
+        block_metadata = PageMetadata()
+        html = block_to_html_node(block, image_props, block_metadata).to_html()
+        entry = (html, tuple(block_metadata.links), tuple(block_metadata.images))
+        cache.put(block, *entry)
+    return entry
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Groups lines of markdown into blocks lazily, so a file can be split while
+    it is being read. Blocks are split exactly as markdown_to_blocks splits
+    them.
+
+    Args:
+        lines: Lines of markdown with or without their line endings, such as
+            an open text file.
+
+    Yields:
+        Each block of the markdown in order.
+    """
+    block_lines = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip(" \t"):
+            block_lines.append(line)
+            continue
+        if block_lines:
+            block = "\n".join(block_lines).strip()
+            block_lines = []
+            if block:
+                yield block
+    if block_lines:
+        block = "\n".join(block_lines).strip()
+        if block:
+            yield block
 
 def markdown_to_blocks(markdown: str) -> list[str]:
     """
-    Splits a markdown string into separate blocks based on double newlines,
-    then removes trailing whitespace and any resulting empty blocks.
+    Splits a markdown string into blocks separated by one or more blank lines,
+    in a single pass. Lines holding only spaces or tabs count as blank and
+    CRLF line endings are treated as LF. Each block is stripped of surrounding
+    whitespace and empty blocks are dropped.
 
     Args:
         markdown: The input markdown text.
@@ -39,18 +211,13 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     Returns:
         A list of strings where each string represents a block of text.
     """
-    blocks = markdown.split("\n\n")
+    if "\r" in markdown:
+        markdown = markdown.replace("\r\n", "\n")
+    return [block for block in map(str.strip, blank_lines_pattern.split(markdown)) if block]
 
-    def remove_trailing(block):
-        return block.strip()
-    blocks = list(map(remove_trailing, blocks))
-    
-    if "" in blocks:
-        blocks.remove("")
-    
-    return blocks
-
-def block_to_html_node(block: str) -> ParentNode:
+def block_to_html_node(
+    block: str, image_props: Callable[[str], dict[str, str]] = None, metadata: PageMetadata = None
+) -> ParentNode:
     """
     Converts a markdown block into an equivalent HTML string representation.
 
@@ -58,6 +225,9 @@ def block_to_html_node(block: str) -> ParentNode:
 
     Args:
         block: The markdown block text to be converted.
+        image_props: Optional lookup of the extra attributes of an image by its URL.
+        metadata: Optional PageMetadata the URLs of the block's links and
+            images are added to. Links shown in code blocks are not added.
 
     Returns:
         The HTML string representation of the input markdown block.
@@ -68,17 +238,17 @@ def block_to_html_node(block: str) -> ParentNode:
     block_type = block_to_block_type(block)
 
     if block_type == block_type_paragraph:
-        return paragraph_to_html_node(block)
+        return paragraph_to_html_node(block, image_props, metadata)
     elif block_type == block_type_heading:
-        return heading_to_html_node(block)
+        return heading_to_html_node(block, image_props, metadata)
     elif block_type == block_type_code:
-        return code_to_html_node(block)
+        return code_to_html_node(block, image_props)
     elif block_type == block_type_quote:
-        return quote_to_html_node(block)
+        return quote_to_html_node(block, image_props, metadata)
     elif block_type == block_type_unordered_list:
-        return ulist_to_html_node(block)
+        return ulist_to_html_node(block, image_props, metadata)
     elif block_type == block_type_ordered_list:
-        return olist_to_html_node(block)
+        return olist_to_html_node(block, image_props, metadata)
     else:
         raise ValueError("Invalid block type")
     
@@ -107,57 +277,109 @@ def block_to_block_type(block: str) -> str:
         block_to_block_type("```\nprint('Hello')\n```")  # Returns 'block_type_code'
         block_to_block_type("* List item")  # Returns 'block_type_unordered_list'
     """
-    if re.search(r"^#{1,6}", block):
+    if not block:
+        return block_type_paragraph
+    # Dispatch on the first character so most blocks never reach a regex.
+    first = block[0]
+    if first == "#" and heading_pattern.match(block):
         return block_type_heading
-    if block.startswith("```") and block.endswith("```"):
+    if first == "`" and block.startswith("```") and block.endswith("```"):
         return block_type_code
-    if block.startswith(">"):
+    if first == ">":
         return block_type_quote
-    if block.startswith("* ") or block.startswith("- "):
+    if (first == "*" or first == "-") and block.startswith(" ", 1):
         return block_type_unordered_list
-    if re.search(r"^\d.", block):
+    if first.isdecimal() and ordered_list_pattern.match(block):
         return block_type_ordered_list
-    else:
-        return block_type_paragraph
+    return block_type_paragraph
     
-def text_to_children(text: str) -> list[LeafNode]:
+def block_to_inline_texts(block: str, block_type: str = None) -> list[str]:
+    """
+    Extracts the inline markdown of a block without the block's own markers.
+    The HTML node functions render exactly these texts, so the search index
+    sees the same text as the page.
+
+    Args:
+        block: The markdown block.
+        block_type: The type of the block, determined from its text if not given.
+
+    Returns:
+        One string for a paragraph, heading, code block or quote, and one
+        per item for a list.
+
+    Raises:
+        ValueError: If a line of a quote block does not start with '>'.
+    """
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    if block_type == block_type_heading:
+        return [block.replace("#", "").strip()]
+    if block_type == block_type_code:
+        return [block.replace("```", "").strip()]
+    if block_type == block_type_quote:
+        lines = block.split("\n")
+        for line in lines:
+            if not line.startswith(">"):
+                raise ValueError("Invalid quote block")
+        return [" ".join(line.lstrip(">").strip() for line in lines)]
+    if block_type == block_type_unordered_list:
+        return [item.lstrip("*").lstrip("-").strip() for item in block.split("\n")]
+    if block_type == block_type_ordered_list:
+        return [ordered_list_item_pattern.sub("", item, count=1).strip() for item in block.split("\n")]
+    return [" ".join(block.split("\n"))]
+
+def text_to_children(
+    text: str, image_props: Callable[[str], dict[str, str]] = None, metadata: PageMetadata = None
+) -> list[LeafNode]:
     """
     Converts raw text into a list of HTML leaf nodes (e.g., representing text, images, links).
 
     Args:
         text: The input raw text.
+        image_props: Optional lookup of the extra attributes of an image by its URL.
+        metadata: Optional PageMetadata the URLs of links and images are added to.
 
     Returns:
         A list of LeafNodes, each representing an element within the parsed text.
     """
-    text_nodes = text_to_textnodes(text)
+    with profiling.stage("inline"):
+        text_nodes = text_to_textnodes(text)
+    if metadata is not None:
+        _collect_links(metadata, text_nodes)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, image_props)
         children.append(html_node)
     return children
 
-def paragraph_to_html_node(block: str) -> ParentNode:
+def paragraph_to_html_node(
+    block: str, image_props: Callable[[str], dict[str, str]] = None, metadata: PageMetadata = None
+) -> ParentNode:
     """
     Converts a paragraph of text into an HTML <p> node.
 
     Args:
         block: The text block representing the paragraph.
+        image_props: Optional lookup of the extra attributes of an image by its URL.
+        metadata: Optional PageMetadata the URLs of links and images are added to.
 
     Returns:
         A ParentNode representing the <p> tag and its child nodes.
     """
-    lines = block.split("\n")
-    paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
+    paragraph, = block_to_inline_texts(block, block_type_paragraph)
+    children = text_to_children(paragraph, image_props, metadata)
     return ParentNode("p", children)
 
-def heading_to_html_node(block: str) -> ParentNode:
+def heading_to_html_node(
+    block: str, image_props: Callable[[str], dict[str, str]] = None, metadata: PageMetadata = None
+) -> ParentNode:
     """
     Converts a markdown heading into an HTML heading node (e.g., <h1>, <h2>, etc.).
 
     Args:
         block: The text block representing the heading, including '#' characters.
+        image_props: Optional lookup of the extra attributes of an image by its URL.
+        metadata: Optional PageMetadata the URLs of links and images are added to.
 
     Returns:
         A ParentNode representing the appropriate heading tag and its content.
@@ -168,18 +390,18 @@ def heading_to_html_node(block: str) -> ParentNode:
     heading_level = block.count("#")
     if heading_level > 6:
         raise ValueError(f"Invalid heading level: {heading_level}")
-    block = block.replace("#", "")
-    text = block.strip()
+    text, = block_to_inline_texts(block, block_type_heading)
     tag = f"h{heading_level}"
-    children = text_to_children(text)
+    children = text_to_children(text, image_props, metadata)
     return ParentNode(tag, children)
 
-def code_to_html_node(block: str) -> ParentNode:
+def code_to_html_node(block: str, image_props: Callable[[str], dict[str, str]] = None) -> ParentNode:
     """
     Converts a markdown code block into HTML <pre><code> nodes.
 
     Args:
         block: The text block representing the code, enclosed in "```".
+        image_props: Optional lookup of the extra attributes of an image by its URL.
 
     Returns:
         A ParentNode representing the <pre> tag, containing a <code> node with the code content.
@@ -189,17 +411,21 @@ def code_to_html_node(block: str) -> ParentNode:
     """
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("Invalid code block")
-    text = block.replace("```", "").strip()
-    children = text_to_children(text)
+    text, = block_to_inline_texts(block, block_type_code)
+    children = text_to_children(text, image_props)
     code = ParentNode("code", children)
     return ParentNode("pre", [code])
 
-def quote_to_html_node(block: str) -> ParentNode:
+def quote_to_html_node(
+    block: str, image_props: Callable[[str], dict[str, str]] = None, metadata: PageMetadata = None
+) -> ParentNode:
     """
     Converts a markdown quote block into an HTML <blockquote> node.
 
     Args:
         block: The text block representing the quote, with each line starting with '>'.
+        image_props: Optional lookup of the extra attributes of an image by its URL.
+        metadata: Optional PageMetadata the URLs of links and images are added to.
 
     Returns:
         A ParentNode representing the <blockquote> tag and its content.
@@ -207,48 +433,46 @@ def quote_to_html_node(block: str) -> ParentNode:
     Raises:
         ValueError: If a line within the block does not start with '>'.
     """
-    lines = block.split("\n")
-    new_lines = []
-    for line in lines:
-        if not line.startswith(">"):
-            raise ValueError("Invalid quote block")
-        new_lines.append(line.lstrip(">").strip())
-    content = " ".join(new_lines)
-    children = text_to_children(content)
+    content, = block_to_inline_texts(block, block_type_quote)
+    children = text_to_children(content, image_props, metadata)
     return ParentNode("blockquote", children)
 
-def olist_to_html_node(block: str) -> ParentNode:
+def olist_to_html_node(
+    block: str, image_props: Callable[[str], dict[str, str]] = None, metadata: PageMetadata = None
+) -> ParentNode:
     """
     Converts a markdown ordered list into an HTML <ol> node.
 
     Args:
         block: The text block representing the ordered list, with each item starting with a number and a period.
+        image_props: Optional lookup of the extra attributes of an image by its URL.
+        metadata: Optional PageMetadata the URLs of links and images are added to.
 
     Returns:
         A ParentNode representing the <ol> tag and its child <li> nodes.
     """
-    items = block.split("\n")
     html_items = []
-    for item in items:
-        text = re.sub(r"^\d+\.", "", item).strip()
-        children = text_to_children(text)
+    for text in block_to_inline_texts(block, block_type_ordered_list):
+        children = text_to_children(text, image_props, metadata)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
-def ulist_to_html_node(block: str) -> ParentNode:
+def ulist_to_html_node(
+    block: str, image_props: Callable[[str], dict[str, str]] = None, metadata: PageMetadata = None
+) -> ParentNode:
     """
     Converts a markdown unordered list into an HTML <ul> node.
 
     Args:
         block: The text block representing the unordered list, with each item starting with '*' or '-'.
+        image_props: Optional lookup of the extra attributes of an image by its URL.
+        metadata: Optional PageMetadata the URLs of links and images are added to.
 
     Returns:
         A ParentNode representing the <ul> tag and its child <li> nodes.
     """
-    items = block.split("\n")
     html_items = []
-    for item in items:
-        text = item.lstrip("*").lstrip("-").strip()
-        children = text_to_children(text)
+    for text in block_to_inline_texts(block, block_type_unordered_list):
+        children = text_to_children(text, image_props, metadata)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
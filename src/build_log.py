@@ -0,0 +1,153 @@
+import atexit
+import sys
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+
+class BuildLog:
+    """
+    Leveled build output. Messages are buffered and written in batches instead
+    of one flush per line, and on a terminal a progress counter is redrawn in
+    place below them.
+
+    Args:
+        stream: The text stream written to. Defaults to sys.stdout.
+        level (int): Messages below this level are dropped.
+        batch_size (int): Buffered messages written at once.
+        progress (bool, optional): Whether to draw the progress counter.
+            Defaults to drawing it when stream is a terminal and per-page
+            debug messages are not being logged.
+        progress_interval (float): Minimum seconds between progress redraws.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        level: int = INFO,
+        batch_size: int = 256,
+        progress: bool = None,
+        progress_interval: float = 0.1,
+    ) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.level = level
+        self.batch_size = batch_size
+        if progress is None:
+            progress = INFO <= level < WARNING and self.stream.isatty()
+        self.progress_enabled = progress
+        self.progress_interval = progress_interval
+        self._lines = []
+        self._progress_line = ""
+        self._progress_drawn_at = 0.0
+
+    def log(self, level: int, message: str) -> None:
+        """
+        Buffers a message if its level is enabled. Errors are written at once.
+
+        Args:
+            level: The message level, e.g. INFO.
+            message: The message text.
+        """
+        if level < self.level:
+            return
+        self._lines.append(message)
+        if level >= ERROR or len(self._lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered messages, redrawing the progress counter after them."""
+        if not self._lines:
+            return
+        parts = []
+        if self._progress_line:
+            # Erase the counter so the messages do not run into it.
+            parts.append("\r\033[K")
+        parts.extend(f"{line}\n" for line in self._lines)
+        parts.append(self._progress_line)
+        self._lines.clear()
+        self.stream.write("".join(parts))
+        self.stream.flush()
+
+    def progress(self, done: int, total: int, label: str = "Rendered") -> None:
+        """
+        Redraws the progress counter, at most once per progress_interval
+        except for the final count.
+
+        Args:
+            done: Items finished so far.
+            total: Total number of items.
+            label: Text shown before the count.
+        """
+        if not self.progress_enabled:
+            return
+        now = time.monotonic()
+        if done < total and now - self._progress_drawn_at < self.progress_interval:
+            return
+        self._progress_drawn_at = now
+        self.flush()
+        self._progress_line = f"{label} {done}/{total}"
+        self.stream.write(f"\r\033[K{self._progress_line}")
+        self.stream.flush()
+
+    def end_progress(self) -> None:
+        """Leaves the final progress count on its own line."""
+        self.flush()
+        if self._progress_line:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._progress_line = ""
+            self._progress_drawn_at = 0.0
+
+
+# The log build messages go to; replaced by configure.
+active_log = BuildLog()
+
+
+def configure(**kwargs) -> BuildLog:
+    """
+    Replaces the active log, flushing the old one first.
+
+    Args:
+        **kwargs: Arguments for the new BuildLog.
+
+    Returns:
+        The new active log.
+    """
+    global active_log
+    active_log.flush()
+    active_log = BuildLog(**kwargs)
+    return active_log
+
+
+def debug(message: str) -> None:
+    active_log.log(DEBUG, message)
+
+
+def info(message: str) -> None:
+    active_log.log(INFO, message)
+
+
+def warning(message: str) -> None:
+    active_log.log(WARNING, message)
+
+
+def error(message: str) -> None:
+    active_log.log(ERROR, message)
+
+
+def flush() -> None:
+    active_log.flush()
+
+
+def progress(done: int, total: int, label: str = "Rendered") -> None:
+    active_log.progress(done, total, label)
+
+
+def end_progress() -> None:
+    active_log.end_progress()
+
+
+atexit.register(lambda: active_log.flush())
@@ -0,0 +1,84 @@
+import gzip
+import os
+from pathlib import Path
+
+import build_log
+from parallel import process_pool
+
+try:
+    import brotli
+except ImportError:  # Brotli sidecars are only written when the package is installed
+    brotli = None
+
+compressible_suffixes = (".html", ".css", ".js")
+sidecar_suffixes = (".gz", ".br")
+
+
+def precompress(dest_dir_path: Path, min_size: int = 1024, workers: int = None) -> int:
+    """
+    Writes gzip, and Brotli when available, sidecar files next to every HTML,
+    CSS and JS file in the output directory so the server can send them
+    without compressing on the request path.
+
+    Files smaller than min_size are skipped, as are files whose sidecar is
+    already newer than the file. Sidecars whose original file no longer
+    exists are removed.
+
+    Args:
+        dest_dir_path: The output directory.
+        min_size: Files smaller than this many bytes are not compressed.
+        workers: Number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        The number of sidecar files written.
+    """
+    encodings = [".gz"] if brotli is None else [".gz", ".br"]
+    jobs = []
+    for dir_path, _, file_names in os.walk(dest_dir_path):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            base, suffix = os.path.splitext(path)
+            if suffix in sidecar_suffixes and base.endswith(compressible_suffixes):
+                if not os.path.exists(base):
+                    os.unlink(path)
+                continue
+            if not path.endswith(compressible_suffixes):
+                continue
+            stat = os.stat(path)
+            if stat.st_size < min_size:
+                for encoding in sidecar_suffixes:
+                    if os.path.exists(path + encoding):
+                        os.unlink(path + encoding)
+                continue
+            for encoding in encodings:
+                sidecar = path + encoding
+                try:
+                    if os.stat(sidecar).st_mtime_ns >= stat.st_mtime_ns:
+                        continue
+                except FileNotFoundError:
+                    pass
+                jobs.append((path, encoding))
+
+    if len(jobs) > 1 and workers != 1:
+        with process_pool(max_workers=workers) as executor:
+            list(executor.map(_compress_file, *zip(*jobs), chunksize=16))
+    else:
+        for path, encoding in jobs:
+            _compress_file(path, encoding)
+
+    build_log.info(f"Precompressed {len(jobs)} sidecar files in {dest_dir_path}")
+    return len(jobs)
+
+
+def _compress_file(path: str, encoding: str) -> None:
+    with open(path, "rb") as file:
+        data = file.read()
+    if encoding == ".br":
+        compressed = brotli.compress(data)
+    else:
+        # mtime=0 keeps the output identical for identical input.
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    tmp_path = f"{path}{encoding}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(compressed)
+    Path(tmp_path).replace(path + encoding)
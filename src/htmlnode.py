@@ -1,3 +1,11 @@
+import io
+from types import MappingProxyType
+
+# Shared read-only props of every node created without attributes, so those
+# nodes do not each keep an empty dict alive.
+EMPTY_PROPS = MappingProxyType({})
+
+
 class HTMLNode:
     """
     Represents a basic HTML node. Can be either a parent node or a leaf node.
@@ -9,16 +17,33 @@ class HTMLNode:
         **props: Additional attributes for the HTML node, provided as key-value pairs.
     """
 
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self, tag: str = None, value: str = None, children: object = None, **props
     ) -> None:
         self.tag = tag
         self.value = value
         self.children = children
-        self.props = props
+        self.props = props if props else EMPTY_PROPS
     
     def to_html(self):
-        """Abstract method to generate the HTML representation of the node.
+        """
+        Generates the HTML representation of the node by streaming it into an
+        in-memory buffer.
+
+        Returns:
+            str: The HTML representation of the node.
+        """
+        buffer = io.StringIO()
+        self.write_html(buffer)
+        return buffer.getvalue()
+
+    def write_html(self, stream) -> None:
+        """Abstract method to write the HTML representation of the node to a stream.
+
+        Args:
+            stream: A text stream, such as an open file, with a write method.
 
         Raises:
             NotImplementedError: This method must be implemented in derived classes.
@@ -60,7 +85,7 @@ class HTMLNode:
         Returns:
             str: A string containing the class name and its attributes.
         """
-        return f"{self.__class__.__name__}({self.tag}, {self.value}, {self.children}, {self.props})"
+        return f"{self.__class__.__name__}({self.tag}, {self.value}, {self.children}, {dict(self.props)})"
     
 class LeafNode(HTMLNode):
     """
@@ -72,6 +97,8 @@ class LeafNode(HTMLNode):
         **props: Additional HTML attributes for the node.
     """
 
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, **props) -> None:
         super().__init__(tag, value, None, **props)
 
@@ -92,9 +119,21 @@ class LeafNode(HTMLNode):
             return self.value
         
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+    def write_html(self, stream) -> None:
+        """
+        Writes the HTML representation of the LeafNode to a stream.
+
+        Args:
+            stream: A text stream with a write method.
+
+        Raises:
+            ValueError: If the 'value' is None.
+        """
+        stream.write(self.to_html())
     
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}({self.tag}, {self.value}, {self.props})"
+        return f"{self.__class__.__name__}({self.tag}, {self.value}, {dict(self.props)})"
     
 class ParentNode(HTMLNode):
     """
@@ -105,15 +144,19 @@ class ParentNode(HTMLNode):
         children (object): A list of child HTMLNode objects. 
         **props: Additional HTML attributes for the node.
     """
+
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list[object], **props) -> None:
         super().__init__(tag, None, children, **props)
 
-    def to_html(self):
+    def write_html(self, stream) -> None:
         """
-        Generates the HTML representation of the ParentNode and its children.
+        Writes the HTML representation of the ParentNode and its children to a
+        stream, without building the subtree as an intermediate string.
 
-        Returns:
-            str: The HTML representation of the parent node.
+        Args:
+            stream: A text stream with a write method.
 
         Raises:
             ValueError: If the 'tag' is None or the 'children' list is None.
@@ -122,7 +165,10 @@ class ParentNode(HTMLNode):
             raise ValueError("ParentNode must have a tag")
         if self.children is None:
             raise ValueError("ParentNode must have children")
-        return f"<{self.tag}{self.props_to_html()}>{''.join([child.to_html() for child in self.children])}</{self.tag}>"
+        stream.write(f"<{self.tag}{self.props_to_html()}>")
+        for child in self.children:
+            child.write_html(stream)
+        stream.write(f"</{self.tag}>")
     
     def __repr__(self) -> str:
         """
@@ -131,4 +177,4 @@ class ParentNode(HTMLNode):
         Returns:
             str: A string containing the class name and its attributes.
         """
-        return f"{self.__class__.__name__}({self.tag}, {self.value}, {self.children}, {self.props})"
\ No newline at end of file
+        return f"{self.__class__.__name__}({self.tag}, {self.value}, {self.children}, {dict(self.props)})"
\ No newline at end of file
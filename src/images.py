@@ -0,0 +1,352 @@
+import json
+import os
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
+
+import build_log
+from manifest import hash_file
+from parallel import process_pool
+
+try:
+    from PIL import Image
+except ImportError:  # Downscaled variants are only written when Pillow is installed
+    Image = None
+
+IMAGE_SIZES_VERSION = 1
+
+image_suffixes = (".png", ".jpg", ".jpeg", ".gif")
+png_signature = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers, which carry the image dimensions. 0xC4, 0xC8
+# and 0xCC share the range but are other segments.
+jpeg_frame_markers = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def read_image_size(path: Path) -> tuple[int, int]:
+    """
+    Reads the dimensions of a PNG, JPEG or GIF image from its header,
+    without decoding the image data.
+
+    Args:
+        path: The image file.
+
+    Returns:
+        The width and height in pixels, or None if the file is not a
+        recognised image.
+    """
+    with Path(path).open("rb") as image_file:
+        header = image_file.read(24)
+        if header.startswith(png_signature) and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header[:2] == b"\xff\xd8":
+            image_file.seek(2)
+            return _read_jpeg_size(image_file)
+    return None
+
+
+def _read_jpeg_size(image_file) -> tuple[int, int]:
+    # Walk the segments after the start-of-image marker until a frame header.
+    while True:
+        marker = image_file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:
+            fill = image_file.read(1)
+            if not fill:
+                return None
+            code = fill[0]
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+        if code == 0xD9:
+            return None
+        length = image_file.read(2)
+        if len(length) < 2:
+            return None
+        if code in jpeg_frame_markers:
+            frame = image_file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return width, height
+        image_file.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+
+def image_key(src: str) -> str:
+    """
+    Normalises an image URL to the key image attributes are stored under.
+
+    Args:
+        src: The image URL as written in the markdown.
+
+    Returns:
+        The decoded URL path, or None for URLs that are not absolute paths
+        on the site, whose files cannot be located.
+    """
+    parts = urlsplit(src)
+    if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+        return None
+    return unquote(parts.path)
+
+
+def variant_path(relative: str, width: int) -> str:
+    """
+    Names the downscaled variant of an image.
+
+    Args:
+        relative: The image path relative to the static directory.
+        width: The width of the variant.
+
+    Returns:
+        The variant path relative to the output directory, e.g.
+        "images/photo-480w.png".
+    """
+    base, suffix = os.path.splitext(relative)
+    return f"{base}-{width}w{suffix}"
+
+
+class ImageSizes:
+    """
+    The extra attributes rendered into the <img> tags of static images:
+    width and height, so browsers reserve the space before the image loads,
+    loading="lazy" and decoding="async", and a srcset of downscaled variants.
+
+    Dimensions are read from image headers and cached by content hash in a
+    JSON file, together with the size and modification time of each image,
+    so unchanged images are neither hashed nor read again.
+
+    Args:
+        path (Path): Where the cache is stored between builds.
+        static_dir_path (Path): The static directory images are published from.
+        attributes (bool): Whether images get width, height, loading and
+            decoding attributes.
+        widths (Iterable[int]): Widths of the downscaled variants offered in
+            srcset. Each image gets the variants narrower than itself. They
+            are only written, and only listed, when Pillow is installed.
+
+    Attributes:
+        props (dict): The extra attributes of each image, keyed by URL path.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        static_dir_path: Path,
+        attributes: bool = True,
+        widths: Iterable[int] = (),
+    ) -> None:
+        self.path = Path(path)
+        self.static_dir_path = Path(static_dir_path)
+        self.attributes = attributes
+        self.widths = sorted(set(widths))
+        if self.widths and Image is None:
+            build_log.warning("Pillow is not installed; image variants are not written")
+            self.widths = []
+        data = self._load()
+        self.files = data.get("files", {})
+        self.sizes = data.get("sizes", {})
+        self.props = data.get("props", {})
+        self.variants = data.get("variants", {})
+
+    def _load(self) -> dict:
+        try:
+            with self.path.open("r") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != IMAGE_SIZES_VERSION:
+            return {}
+        return data
+
+    def refresh(self) -> set[str]:
+        """
+        Reads the dimensions of new and changed images and recomputes the
+        attributes of every image.
+
+        Returns:
+            The URL paths of images whose attributes changed since the last
+            saved refresh, including images added and removed. Pages showing
+            them must be rendered again.
+        """
+        previous = self.props
+        self.props = {}
+        if self.attributes or self.widths:
+            files = {}
+            for dir_path, _, file_names in os.walk(self.static_dir_path):
+                for file_name in file_names:
+                    if not file_name.lower().endswith(image_suffixes):
+                        continue
+                    path = os.path.join(dir_path, file_name)
+                    relative = Path(path).relative_to(self.static_dir_path).as_posix()
+                    stat = os.stat(path)
+                    entry = self.files.get(relative)
+                    if entry is None or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+                        entry = [stat.st_size, stat.st_mtime_ns, hash_file(path)]
+                    if entry[2] not in self.sizes:
+                        self.sizes[entry[2]] = read_image_size(path)
+                    files[relative] = entry
+                    size = self.sizes[entry[2]]
+                    if size is not None:
+                        self.props["/" + relative] = self._image_props(relative, *size)
+            self.files = files
+        return {url for url in previous.keys() | self.props.keys() if previous.get(url) != self.props.get(url)}
+
+    def _image_props(self, relative: str, width: int, height: int) -> dict[str, str]:
+        props = {}
+        if self.attributes:
+            props["width"] = str(width)
+            props["height"] = str(height)
+            props["loading"] = "lazy"
+            props["decoding"] = "async"
+        widths = [variant for variant in self.widths if variant < width]
+        if widths:
+            candidates = [f"{quote('/' + variant_path(relative, variant))} {variant}w" for variant in widths]
+            candidates.append(f"{quote('/' + relative)} {width}w")
+            props["srcset"] = ", ".join(candidates)
+            props["sizes"] = f"(max-width: {width}px) 100vw, {width}px"
+        return props
+
+    def image_props(self, src: str) -> dict[str, str]:
+        """
+        Looks up the extra attributes of an image.
+
+        Args:
+            src: The image URL as written in the markdown.
+
+        Returns:
+            The attributes, empty for images that are not static files.
+        """
+        return self.props.get(image_key(src), {})
+
+    def write_variants(self, dest_dir_path: Path, workers: int = 1) -> int:
+        """
+        Writes the downscaled variants of every image into the output
+        directory, on a process pool when workers is above 1. Variants are
+        only written again when their image changed or they are missing, and
+        variants no longer wanted are removed.
+
+        Args:
+            dest_dir_path: The output directory.
+            workers: Number of worker processes.
+
+        Returns:
+            The number of images whose variants were written.
+        """
+        if Image is None and not self.variants:
+            return 0
+        variants = {}
+        jobs = []
+        for relative, (_, _, content_hash) in self.files.items():
+            size = self.sizes.get(content_hash)
+            if size is None:
+                continue
+            widths = [variant for variant in self.widths if variant < size[0]]
+            if not widths:
+                continue
+            variants[relative] = [content_hash, widths]
+            outputs = [(str(dest_dir_path / variant_path(relative, width)), width) for width in widths]
+            if self.variants.get(relative) != variants[relative] or not all(
+                os.path.exists(output) for output, _ in outputs
+            ):
+                jobs.append((str(self.static_dir_path / relative), outputs))
+        for relative, (_, widths) in self.variants.items():
+            kept = variants.get(relative, [None, []])[1]
+            for width in widths:
+                if width not in kept:
+                    (dest_dir_path / variant_path(relative, width)).unlink(missing_ok=True)
+        if workers > 1 and len(jobs) > 1:
+            with process_pool(max_workers=workers) as executor:
+                list(executor.map(_write_image_variants, *zip(*jobs)))
+        else:
+            for source, outputs in jobs:
+                _write_image_variants(source, outputs)
+        self.variants = variants
+        return len(jobs)
+
+    def save(self) -> None:
+        """Writes the cache to disk, dropping dimensions of images no longer present."""
+        hashes = {entry[2] for entry in self.files.values()}
+        data = {
+            "version": IMAGE_SIZES_VERSION,
+            "files": self.files,
+            "sizes": {content_hash: size for content_hash, size in self.sizes.items() if content_hash in hashes},
+            "props": self.props,
+            "variants": self.variants,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w") as cache_file:
+            json.dump(data, cache_file, separators=(",", ":"))
+        tmp_path.replace(self.path)
+
+
+def _write_image_variants(source: str, outputs: list[tuple[str, int]]) -> None:
+    with Image.open(source) as image:
+        for output, width in outputs:
+            height = max(1, round(image.height * width / image.width))
+            image.resize((width, height), Image.LANCZOS).save(output)
+            build_log.debug(f"Wrote image variant {output}")
+    build_log.flush()
+
+
+def pages_showing(records: Iterable, urls: set[str]) -> set[str]:
+    """
+    Finds the pages that show any of a set of images.
+
+    Args:
+        records: The PageRecords of the site index.
+        urls: Image URL paths, as returned by ImageSizes.refresh.
+
+    Returns:
+        The source paths of the pages.
+    """
+    if not urls:
+        return set()
+    return {record.source for record in records if any(image_key(src) in urls for src in record.images)}
+
+
+# The image attributes rendered into img tags; set by enable.
+active_sizes = None
+
+
+def enable(sizes: ImageSizes) -> None:
+    """Renders the attributes of sizes into every img tag until disable is called."""
+    global active_sizes
+    active_sizes = sizes
+
+
+def disable() -> None:
+    """Stops adding attributes to img tags."""
+    global active_sizes
+    active_sizes = None
+
+
+def image_props(src: str) -> dict[str, str]:
+    """
+    Looks up the extra attributes of an image with the enabled ImageSizes.
+
+    Args:
+        src: The image URL as written in the markdown.
+
+    Returns:
+        The attributes, empty when no ImageSizes is enabled.
+    """
+    if active_sizes is None:
+        return {}
+    return active_sizes.image_props(src)
+
+
+def page_image_props(srcs: Iterable[str]) -> list[dict[str, str]]:
+    """
+    Lists the attributes a page's images are rendered with, so a cached
+    rendering can be checked against the current images.
+
+    Args:
+        srcs: The image URLs of the page, as in PageMetadata.images.
+
+    Returns:
+        The attributes of each image in order.
+    """
+    return [image_props(src) for src in srcs]
@@ -8,6 +8,14 @@ from textnode import (
     text_type_image,
     text_type_link
 )
+from patterns import image_pattern, inline_token_pattern, link_pattern
+
+# Inline delimiters recognised by the text_to_textnodes scanner.
+inline_delimiters = {
+    "**": text_type_bold,
+    "*": text_type_italic,
+    "`": text_type_code,
+}
 
 
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: str) -> list[TextNode]:
@@ -52,33 +60,7 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
     Returns:
         A new list of TextNodes with image sections split out.
     """
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != text_type_text:
-            new_nodes.append(old_node)
-            continue
-        original_text = old_node.text
-        images = extract_markdown_images(original_text)
-        if len(images) == 0:
-            new_nodes.append(old_node)
-            continue
-        for image in images:
-            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], text_type_text))
-            new_nodes.append(
-                TextNode(
-                    image[0],
-                    text_type_image,
-                    image[1],
-                )
-            )
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, text_type_text))
-    return new_nodes
+    return _split_nodes_pattern(old_nodes, image_pattern, text_type_image)
 
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     """
@@ -90,26 +72,29 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     Returns:
         A new list of TextNodes with link sections split out.
     """
+    return _split_nodes_pattern(old_nodes, link_pattern, text_type_link)
+
+def _split_nodes_pattern(old_nodes: list[TextNode], pattern: re.Pattern, text_type: str) -> list[TextNode]:
+    """
+    Splits text TextNodes around the matches of an image or link pattern,
+    slicing the text by match offsets so each node is scanned exactly once.
+    """
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != text_type_text:
             new_nodes.append(old_node)
             continue
-        original_text = old_node.text
-        links = extract_markdown_links(original_text)
-        if len(links) == 0:
+        text = old_node.text
+        position = 0
+        for match in pattern.finditer(text):
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position:match.start()], text_type_text))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+        if position == 0:
             new_nodes.append(old_node)
-            continue
-        for link in links:
-            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], text_type_text))
-            new_nodes.append(TextNode(link[0], text_type_link, link[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, text_type_text))
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], text_type_text))
     return new_nodes
 
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
@@ -121,7 +106,7 @@ def extract_markdown_images(text: str) -> list[tuple[str, str]]:
     Returns:
         A list of tuples where each tuple contains the alt text and URL of an image.
     """
-    return re.findall(r'!\[(.*?)\]\((.*?)\)', text)
+    return image_pattern.findall(text)
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
     """
@@ -132,23 +117,68 @@ def extract_markdown_links(text: str) -> list[tuple[str, str]]:
     Returns:
         A list of tuples where each tuple contains the link text and URL of a link.
     """
-    return re.findall(r'\[(.*?)\]\((.*?)\)', text)
+    return link_pattern.findall(text)
+
 
 def text_to_textnodes(text: str) -> list[TextNode]:
     """
     Converts a raw text string into a list of TextNodes, parsing common markdown elements.
 
+    The text is scanned once from left to right. At each candidate token the
+    scanner either consumes a complete bold, italic, code, image or link span
+    or treats the character as plain text, so the cost stays linear in the
+    length of the text no matter how many spans it contains.
+
     Args:
         text: The input text string.
 
     Returns:
         A list of TextNodes representing the parsed text, including bold, italic, code, images, and links.
+
+    Raises:
+        ValueError: If a bold, italic or code delimiter is not closed.
     """
-    node = TextNode(text, text_type_text)
-    first_nodes = split_nodes_delimiter([node], "**", text_type_bold)
-    second_nodes = split_nodes_delimiter(first_nodes, "*", text_type_italic)
-    third_nodes = split_nodes_delimiter(second_nodes, "`", text_type_code)
-    fourth_nodes = split_nodes_image(third_nodes)
-    final_nodes = split_nodes_link(fourth_nodes)
-
-    return final_nodes
\ No newline at end of file
+    nodes = []
+    text_start = 0
+    position = 0
+    # The next image and link match at or after the scan position, reused
+    # until the scanner moves past it so each regex search covers new text.
+    # False means not searched yet, None means there are no further matches.
+    next_match = {image_pattern: False, link_pattern: False}
+
+    while True:
+        token = inline_token_pattern.search(text, position)
+        if token is None:
+            break
+        start = token.start()
+        delimiter = token.group()
+
+        if delimiter in inline_delimiters:
+            end = text.find(delimiter, token.end())
+            if end == -1:
+                raise ValueError("Invalid markdown, formatted section not closed")
+            if text_start < start:
+                nodes.append(TextNode(text[text_start:start], text_type_text))
+            if token.end() < end:
+                nodes.append(TextNode(text[token.end():end], inline_delimiters[delimiter]))
+            position = text_start = end + len(delimiter)
+            continue
+
+        pattern = image_pattern if delimiter == "![" else link_pattern
+        match = next_match[pattern]
+        if match is False or (match is not None and match.start() < start):
+            match = next_match[pattern] = pattern.search(text, start)
+        if match is None or match.start() != start:
+            position = start + 1
+            continue
+        if text_start < start:
+            nodes.append(TextNode(text[text_start:start], text_type_text))
+        if pattern is image_pattern:
+            nodes.append(TextNode(match.group(1), text_type_image, match.group(2)))
+        else:
+            nodes.append(TextNode(match.group(1), text_type_link, match.group(2)))
+        position = text_start = match.end()
+
+    if text_start < len(text):
+        nodes.append(TextNode(text[text_start:], text_type_text))
+    return nodes
@@ -0,0 +1,145 @@
+import os
+from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from urllib.parse import unquote, urljoin, urlsplit
+
+from site_index import PageRecord, SiteIndex
+
+
+def resolve_link(page_url: str, href: str) -> str:
+    """
+    Resolves a link on a page to the URL path it points to within the site.
+
+    Args:
+        page_url: The URL path of the page holding the link, e.g. "/blog/".
+        href: The link target as written in the markdown.
+
+    Returns:
+        The decoded absolute URL path without query or fragment, or None for
+        links that leave the site or stay on the same page, such as
+        "https://...", "mailto:..." or "#section".
+    """
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    return unquote(urljoin(page_url, parts.path))
+
+
+class LinkGraph:
+    """
+    The internal links and images of every page in the site index, resolved
+    to the URL paths they point to.
+
+    Pages are keyed by their index URL. A link may name a page by that URL,
+    by its index.html file or, for a directory index, without the trailing
+    slash; all three resolve to the same page so backlinks are complete.
+
+    Args:
+        index (SiteIndex): The site index the links are read from.
+
+    Attributes:
+        pages (dict): PageRecords keyed by URL.
+        links (dict): For every page URL, a (href, target) pair for each
+            internal link, where target is the resolved URL path.
+        images (dict): For every page URL, a (src, target) pair for each
+            image hosted on the site.
+    """
+
+    def __init__(self, index: SiteIndex) -> None:
+        self.pages = {record.url: record for record in index.records.values()}
+        self.links = {}
+        self.images = {}
+        self._backlinks = defaultdict(set)
+        for url, record in self.pages.items():
+            self.links[url] = _resolve_all(url, record.links)
+            self.images[url] = _resolve_all(url, record.images)
+            for _, target in self.links[url]:
+                page = self.page_url(target)
+                if page is not None and page != url:
+                    self._backlinks[page].add(url)
+
+    def page_url(self, path: str) -> str:
+        """
+        Finds the page a URL path points to.
+
+        Args:
+            path: A resolved URL path.
+
+        Returns:
+            The URL of the page, or None if no page is served at path.
+        """
+        if path in self.pages:
+            return path
+        if path.endswith("/index.html") and path[: -len("index.html")] in self.pages:
+            return path[: -len("index.html")]
+        if path + "/" in self.pages:
+            return path + "/"
+        return None
+
+    def backlinks(self, url: str) -> list[PageRecord]:
+        """
+        Lists the pages linking to a page.
+
+        Args:
+            url: The URL of the page.
+
+        Returns:
+            The PageRecords of the other pages linking to it, ordered by URL.
+        """
+        return [self.pages[source] for source in sorted(self._backlinks.get(url, ()))]
+
+    def broken_links(self, file_paths: Iterable[str]) -> list[tuple[PageRecord, str]]:
+        """
+        Finds internal links that point to neither a page nor a published
+        file, and images that are not published, such as images missing
+        from the static directory.
+
+        Args:
+            file_paths: The path of every file in the output directory,
+                relative to it, e.g. "images/logo.png", as returned by
+                published_paths.
+
+        Returns:
+            A (page, href) pair for each broken link or image, ordered by
+            page URL.
+        """
+        file_urls = {"/" + path for path in file_paths}
+        broken = []
+        for url in sorted(self.pages):
+            record = self.pages[url]
+            for href, target in self.links[url]:
+                if target not in file_urls and self.page_url(target) is None:
+                    broken.append((record, href))
+            for src, target in self.images[url]:
+                if target not in file_urls:
+                    broken.append((record, src))
+        return broken
+
+
+def published_paths(dest_dir_path: Path) -> set[str]:
+    """
+    Lists every file in the output directory, so links can be checked with
+    set lookups instead of a filesystem call or request per link.
+
+    Args:
+        dest_dir_path: The output directory.
+
+    Returns:
+        The path of every file, relative to dest_dir_path with "/" separators.
+    """
+    paths = set()
+    for dir_path, _, file_names in os.walk(dest_dir_path):
+        relative = Path(dir_path).relative_to(dest_dir_path).as_posix()
+        prefix = "" if relative == "." else relative + "/"
+        paths.update(prefix + file_name for file_name in file_names)
+    return paths
+
+
+def _resolve_all(page_url: str, hrefs: list[str]) -> list[tuple[str, str]]:
+    resolved = []
+    for href in hrefs:
+        target = resolve_link(page_url, href)
+        if target is not None:
+            resolved.append((href, target))
+    return resolved
@@ -0,0 +1,173 @@
+import heapq
+import html
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from site_index import PageRecord, SiteIndex
+from template import Template
+
+listing_file_name = "pages.html"
+
+
+def page_updated(record: PageRecord) -> datetime:
+    """
+    Determines when a page was last updated: its "date" front matter value
+    if that is an ISO 8601 date, otherwise the modification time of its source.
+
+    Args:
+        record: The indexed page.
+
+    Returns:
+        A timezone-aware datetime.
+    """
+    date = record.front_matter.get("date")
+    if date:
+        try:
+            updated = datetime.fromisoformat(date)
+        except ValueError:
+            pass
+        else:
+            return updated if updated.tzinfo else updated.replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(record.mtime_ns / 1e9, timezone.utc)
+
+
+def write_sitemap(index: SiteIndex, dest_dir_path: Path, base_url: str) -> Path:
+    """
+    Writes sitemap.xml listing every indexed page.
+
+    Args:
+        index: The site index.
+        dest_dir_path: The output directory.
+        base_url: The absolute URL the site is published at.
+
+    Returns:
+        The path of the sitemap.
+    """
+    base_url = base_url.rstrip("/")
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for record in index.pages():
+        loc = html.escape(base_url + record.url)
+        lastmod = page_updated(record).date().isoformat()
+        lines.append(f"<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>")
+    lines.append("</urlset>\n")
+    path = Path(dest_dir_path, "sitemap.xml")
+    path.write_text("\n".join(lines))
+    return path
+
+
+def write_feed(index: SiteIndex, dest_dir_path: Path, base_url: str, limit: int = 20) -> Path:
+    """
+    Writes feed.xml, an Atom feed of the most recently updated pages. The
+    feed is titled after the site's top-level index page.
+
+    Args:
+        index: The site index.
+        dest_dir_path: The output directory.
+        base_url: The absolute URL the site is published at.
+        limit: The number of pages in the feed.
+
+    Returns:
+        The path of the feed.
+    """
+    base_url = base_url.rstrip("/")
+    home = index.records.get("index.md")
+    site_title = html.escape(home.title if home is not None and home.title else base_url)
+    entries = heapq.nlargest(limit, index.records.values(), key=page_updated)
+    updated = page_updated(entries[0]) if entries else datetime.now(timezone.utc)
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"<title>{site_title}</title>",
+        f'<link href="{html.escape(base_url)}/"/>',
+        f'<link rel="self" href="{html.escape(base_url)}/feed.xml"/>',
+        f"<id>{html.escape(base_url)}/</id>",
+        f"<updated>{updated.isoformat()}</updated>",
+        f"<author><name>{site_title}</name></author>",
+    ]
+    for record in entries:
+        url = html.escape(base_url + record.url)
+        lines.append("<entry>")
+        lines.append(f"<title>{html.escape(record.title or record.url)}</title>")
+        lines.append(f'<link href="{url}"/>')
+        lines.append(f"<id>{url}</id>")
+        lines.append(f"<updated>{page_updated(record).isoformat()}</updated>")
+        author = record.front_matter.get("author")
+        if author:
+            lines.append(f"<author><name>{html.escape(author)}</name></author>")
+        lines.append("</entry>")
+    lines.append("</feed>\n")
+    path = Path(dest_dir_path, "feed.xml")
+    path.write_text("\n".join(lines))
+    return path
+
+
+def write_section_listings(index: SiteIndex, dest_dir_path: Path, template_path: Path) -> int:
+    """
+    Writes a pages.html listing into the output directory of every content
+    section, linking to the pages directly inside it and the index pages of
+    its subsections, newest first.
+
+    Only the listings of sections with changed index records, and listings
+    older than the template, are written again. Listings of sections with no
+    pages left are removed.
+
+    Args:
+        index: The site index.
+        dest_dir_path: The output directory.
+        template_path: The HTML template listings are rendered into.
+
+    Returns:
+        The number of listings written.
+    """
+    sections = defaultdict(list)
+    titles = {}
+    for record in index.records.values():
+        if record.source.rpartition("/")[2] == "index.md":
+            titles[record.section] = record.title
+        if record.source != "index.md":
+            sections[_listing_section(record.source)].append(record)
+    stale = set()
+    for source in index.changed:
+        stale.add(_listing_section(source))
+        if source.rpartition("/")[2] == "index.md":
+            stale.add(source.rpartition("/")[0])
+    template_mtime_ns = Path(template_path).stat().st_mtime_ns
+    template = None
+    written = 0
+    for section, records in sections.items():
+        path = Path(dest_dir_path, section, listing_file_name)
+        if section not in stale:
+            try:
+                if path.stat().st_mtime_ns >= template_mtime_ns:
+                    continue
+            except FileNotFoundError:
+                pass
+        if template is None:
+            template = Template.from_file(template_path)
+        title = titles.get(section) or section.rpartition("/")[2] or "Pages"
+        _write_listing(path, title, records, template)
+        written += 1
+    for section in stale - sections.keys():
+        Path(dest_dir_path, section, listing_file_name).unlink(missing_ok=True)
+    return written
+
+
+def _listing_section(source: str) -> str:
+    # A section's index page is listed with its parent section.
+    directory, _, name = source.rpartition("/")
+    if name == "index.md":
+        return directory.rpartition("/")[0]
+    return directory
+
+
+def _write_listing(path: Path, title: str, records: list[PageRecord], template: Template) -> None:
+    items = []
+    for record in sorted(records, key=lambda record: (-page_updated(record).timestamp(), record.url)):
+        items.append(f'<li><a href="{html.escape(record.url)}">{html.escape(record.title or record.url)}</a></li>')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as listing_file:
+        template.write(listing_file, {"Title": html.escape(title), "Content": f"<ul>{''.join(items)}</ul>"})
@@ -1,77 +1,840 @@
+import argparse
+import cProfile
+import functools
+import io
 import os
 import shutil
+import sys
+import time
 from pathlib import Path
-from block_markdown import markdown_to_html_node
+from assets import compare_modes, link_modes, sync_asset_files, sync_assets
+from block_cache import BlockCache
+import build_log
+from block_markdown import MarkdownStream, iter_blocks, markdown_to_page, read_page_metadata
+from compress import precompress
+import images
+from images import ImageSizes
+from link_graph import LinkGraph, published_paths
+from listings import write_feed, write_section_listings, write_sitemap
+from manifest import BuildManifest, hash_bytes, hash_file
+from page_metadata import PageMetadata, split_front_matter_lines
+from parallel import process_pool
+from parse_cache import ParseCache
+import profiling
+from search_index import SearchIndex
+from site_index import PageRecord, SiteIndex
+from template import Template
+from watch import touch_reload_stamp, watch
+
+# Markdown sources at least this many bytes are rendered without being read whole.
+stream_threshold = 8 * 1024 * 1024
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to render pages",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=0,
+        help="Cache the rendered HTML of up to this many repeated blocks (0 disables)",
+    )
+    parser.add_argument(
+        "--parse-cache-size",
+        type=int,
+        default=0,
+        help="Keep up to this many MB of parsed page bodies in .parse_cache (0, the default, disables)",
+    )
+    parser.add_argument(
+        "--clear-parse-cache",
+        action="store_true",
+        help="Empty the parse cache before building",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="Absolute URL the site is published at; enables sitemap.xml and feed.xml",
+    )
+    parser.add_argument(
+        "--listings",
+        action="store_true",
+        help="Write a pages.html listing into every content section",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Write a sharded full-text search index into the search output directory",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="Report internal links and images that point to nothing published; "
+        "exit with status 1 if any are found",
+    )
+    parser.add_argument(
+        "--image-attributes",
+        action="store_true",
+        help="Give images in static/ width, height, loading=lazy and decoding=async attributes",
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=int,
+        nargs="+",
+        default=[],
+        help="Write downscaled copies of static images at these widths and list them "
+        "in srcset (requires Pillow)",
+    )
+    parser.add_argument(
+        "--asset-link",
+        choices=link_modes,
+        default="reflink",
+        help="How static assets are published; reflink and hardlink fall back to copy",
+    )
+    parser.add_argument(
+        "--asset-compare",
+        choices=compare_modes,
+        default="stat",
+        help="How unchanged static assets are detected",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Write gzip (and Brotli, if installed) sidecars for HTML, CSS and JS outputs",
+    )
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=1024,
+        help="Smallest output size in bytes that gets compressed sidecars",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild the pages affected by each change",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each build stage and print a report (renders on a single worker)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="Number of slowest pages listed in the profile report",
+    )
+    parser.add_argument(
+        "--profile-pstats",
+        type=Path,
+        help="With --profile, also write a cProfile dump for pstats or snakeviz",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        type=Path,
+        help="With --profile, also write a Chrome trace JSON of every stage",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Only report warnings and errors",
+    )
+    verbosity.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Also report every page and file written",
+    )
+    args = parser.parse_args()
+    if args.quiet:
+        build_log.configure(level=build_log.WARNING)
+    elif args.verbose:
+        build_log.configure(level=build_log.DEBUG)
+
     dir_path_content = Path("content")
     template_path = Path("template.html")
     dest_dir_path = Path("public")
-    generate_pages_recursive(dir_path_content, template_path, dest_dir_path)
+    static_dir_path = Path("static")
+    manifest_path = Path(".build_manifest.json")
+    parse_cache_path = Path(".parse_cache")
+    site_index_path = Path(".site_index.jsonl")
+    search_state_path = Path(".search_index.jsonl")
+    image_sizes_path = Path(".image_sizes.json")
 
+    profiler = None
+    python_profiler = None
+    if args.profile:
+        # Stages are timed in this process, so render serially.
+        args.workers = 1
+        profiler = profiling.BuildProfiler(trace=args.profile_trace is not None)
+        profiling.enable(profiler)
+        if args.profile_pstats:
+            python_profiler = cProfile.Profile()
+            python_profiler.enable()
 
-def generate_pages_recursive(dir_path_content: Path, template_path: Path, dest_dir_path: Path) -> None:
-    if dir_path_content.exists() and template_path.exists():
-        if not dir_path_content.is_file():
-            dest_dir_path.mkdir(parents=False, exist_ok=True)
+    if not template_path.is_file():
+        build_log.warning(f"Template {template_path} not found; nothing to build")
+        return
+    manifest = BuildManifest(manifest_path, hash_file(template_path))
+    block_cache = BlockCache(args.block_cache_size) if args.block_cache_size > 0 else None
+    if args.clear_parse_cache:
+        ParseCache(parse_cache_path).clear()
+    parse_cache = None
+    if args.parse_cache_size > 0:
+        parse_cache = ParseCache(parse_cache_path, args.parse_cache_size * 1024 * 1024)
+    site_index = SiteIndex(site_index_path)
+    image_sizes = ImageSizes(image_sizes_path, static_dir_path, args.image_attributes, args.image_widths)
+    with profiling.stage("images"):
+        changed_images = image_sizes.refresh()
+    images.enable(image_sizes)
+    search_index = None
+    if args.search:
+        search_index = SearchIndex(search_state_path, dest_dir_path / "search", dir_path_content)
+    generate_pages_recursive(
+        dir_path_content,
+        template_path,
+        dest_dir_path,
+        manifest,
+        workers=args.workers,
+        block_cache=block_cache,
+        parse_cache=parse_cache,
+        site_index=site_index,
+        changed_images=changed_images,
+    )
+    write_index_outputs = functools.partial(
+        update_index_outputs,
+        site_index,
+        dest_dir_path,
+        template_path,
+        args.base_url,
+        args.listings,
+        search_index,
+        args.workers,
+    )
+    with profiling.stage("index"):
+        write_index_outputs()
+    if parse_cache is not None:
+        with profiling.stage("cache"):
+            parse_cache.evict()
+    with profiling.stage("assets"):
+        manifest.assets = sync_assets(
+            static_dir_path,
+            dest_dir_path,
+            manifest.assets,
+            link_mode=args.asset_link,
+            compare=args.asset_compare,
+        )
+    with profiling.stage("images"):
+        image_sizes.write_variants(dest_dir_path, args.workers)
+        image_sizes.save()
+    with profiling.stage("manifest"):
+        manifest.save()
+    broken_links = 0
+    if args.check_links:
+        with profiling.stage("links"):
+            broken_links = report_broken_links(site_index, dest_dir_path)
+    if args.compress:
+        with profiling.stage("compress"):
+            precompress(dest_dir_path, args.compress_min_size, args.workers)
+    if block_cache is not None:
+        build_log.info(f"Block cache: {block_cache.hits} hits, {block_cache.misses} misses")
+    if parse_cache is not None:
+        build_log.info(f"Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses")
 
-        if dir_path_content.is_file():
-            with dir_path_content.open("r") as markdown_file:
-                markdown_content = markdown_file.read()
-            with template_path.open("r") as template_file:
-                template_content = template_file.read()
+    if profiler is not None:
+        profiling.disable()
+        if python_profiler is not None:
+            python_profiler.disable()
+            python_profiler.dump_stats(args.profile_pstats)
+        if args.profile_trace:
+            profiler.write_chrome_trace(args.profile_trace)
+        build_log.flush()
+        print(profiler.report(args.profile_top))
 
-            html_node = markdown_to_html_node(markdown_content)
-            html_content = html_node.to_html()
+    if args.watch:
 
-            title = extract_title(markdown_content)
-            template_content = template_content.replace("{{ Title }}", title).replace(
-                "{{ Content }}", html_content
-            )
-            output_file_path = dest_dir_path.with_suffix(".html")
-            print(output_file_path)
-            with Path(output_file_path).open("w") as html_file:
-                html_file.write(template_content)
+        def after_rebuild() -> None:
+            write_index_outputs()
+            if args.check_links:
+                report_broken_links(site_index, dest_dir_path)
+
+        watch_site(
+            dir_path_content,
+            template_path,
+            dest_dir_path,
+            static_dir_path,
+            manifest,
+            block_cache,
+            parse_cache,
+            site_index,
+            after_rebuild,
+            image_sizes,
+            args.asset_link,
+            args.asset_compare,
+        )
+    elif broken_links:
+        build_log.flush()
+        sys.exit(1)
+
+
+def update_index_outputs(
+    site_index: SiteIndex,
+    dest_dir_path: Path,
+    template_path: Path,
+    base_url: str = None,
+    listings: bool = False,
+    search_index: SearchIndex = None,
+    workers: int = 1,
+) -> None:
+    """
+    Regenerates the outputs that are queries over the site index, then saves
+    the index. The sitemap and feed are written only when an index record
+    changed, listings only for the sections whose records changed, and the
+    search index only for pages whose content changed.
+
+    Args:
+        site_index: The site index, updated by the build.
+        dest_dir_path: The output directory.
+        template_path: The HTML template listings are rendered into.
+        base_url: The absolute URL of the site. The sitemap and feed are only
+            written when it is given.
+        listings: Whether to write section listings.
+        search_index: Optional search index to update.
+        workers: Number of worker processes used to tokenize pages for search.
+    """
+    if base_url:
+        sitemap_path = dest_dir_path / "sitemap.xml"
+        feed_path = dest_dir_path / "feed.xml"
+        if site_index.changed or not (sitemap_path.exists() and feed_path.exists()):
+            write_sitemap(site_index, dest_dir_path, base_url)
+            write_feed(site_index, dest_dir_path, base_url)
+    if listings:
+        write_section_listings(site_index, dest_dir_path, template_path)
+    if search_index is not None:
+        with profiling.stage("search"):
+            search_index.update(site_index, workers)
+    site_index.save()
+
+
+def report_broken_links(site_index: SiteIndex, dest_dir_path: Path) -> int:
+    """
+    Checks every link and image in the site index against the pages and
+    files published to the output directory, logging each one that points
+    to nothing.
+
+    Args:
+        site_index: The site index, updated by the build.
+        dest_dir_path: The output directory, with static files already published.
+
+    Returns:
+        The number of broken links and images.
+    """
+    broken = LinkGraph(site_index).broken_links(published_paths(dest_dir_path))
+    for record, href in broken:
+        build_log.warning(f"Broken link in {record.source}: {href}")
+    if broken:
+        build_log.warning(f"{len(broken)} broken links and images")
+    return len(broken)
 
-            print(f"{output_file_path} written")
 
-        for child in dir_path_content.glob("*"):
+def watch_site(
+    dir_path_content: Path,
+    template_path: Path,
+    dest_dir_path: Path,
+    static_dir_path: Path,
+    manifest: BuildManifest,
+    block_cache: BlockCache = None,
+    parse_cache: ParseCache = None,
+    site_index: SiteIndex = None,
+    after_rebuild=None,
+    image_sizes: ImageSizes = None,
+    asset_link: str = "reflink",
+    asset_compare: str = "stat",
+) -> None:
+    """
+    Watches the content, static files and template, rebuilding only what each
+    change affects and touching the live-reload stamp after every rebuild.
+    Runs until interrupted, saving the manifest on exit. Changed static files
+    are published with asset_link and asset_compare, as by sync_assets.
+
+    The site index is kept up to date with the rebuilt pages, and
+    after_rebuild, if given, is called with no arguments after every rebuild
+    to regenerate outputs that depend on it. When static files change,
+    image_sizes is refreshed and the pages showing images whose attributes
+    changed are rebuilt.
+    """
+    state = {"manifest": manifest, "template": Template.from_file(template_path)}
+
+    def on_change(changed: set[Path]) -> None:
+        if not template_path.is_file():
+            build_log.warning(f"Template {template_path} not found; waiting for it to return")
+            build_log.flush()
+            return
+        build_log.info(f"Rebuilding after {len(changed)} changed paths")
+        if image_sizes is not None and any(path.is_relative_to(static_dir_path) for path in changed):
+            changed_images = image_sizes.refresh()
+            if changed_images:
+                if block_cache is not None:
+                    block_cache.clear()
+                if site_index is not None:
+                    shown = images.pages_showing(site_index.records.values(), changed_images)
+                    changed = changed | {dir_path_content / source for source in shown}
+            image_sizes.write_variants(dest_dir_path)
+            image_sizes.save()
+        if template_path in changed:
+            state["template"] = Template.from_file(template_path)
+            assets = state["manifest"].assets
+            state["manifest"] = BuildManifest(manifest.path, hash_file(template_path))
+            state["manifest"].assets = assets
             generate_pages_recursive(
-                child,
+                dir_path_content,
                 template_path,
-                dest_dir_path.joinpath(child.parts[-1]),
+                dest_dir_path,
+                state["manifest"],
+                block_cache=block_cache,
+                parse_cache=parse_cache,
+                site_index=site_index,
             )
+            changed = {
+                path
+                for path in changed
+                if not path.is_relative_to(dir_path_content) or not path.exists()
+            }
+        rebuild_changed(
+            changed,
+            dir_path_content,
+            dest_dir_path,
+            static_dir_path,
+            state["template"],
+            state["manifest"],
+            block_cache,
+            parse_cache,
+            site_index,
+            asset_link,
+            asset_compare,
+        )
+        if parse_cache is not None:
+            parse_cache.evict()
+        if after_rebuild is not None:
+            after_rebuild()
+        touch_reload_stamp(dest_dir_path)
+        build_log.flush()
+
+    build_log.info(f"Watching {dir_path_content}, {static_dir_path} and {template_path} for changes")
+    build_log.flush()
+    try:
+        watch([dir_path_content, static_dir_path, template_path], on_change)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state["manifest"].save()
+        build_log.flush()
+
+
+def rebuild_changed(
+    changed: set[Path],
+    dir_path_content: Path,
+    dest_dir_path: Path,
+    static_dir_path: Path,
+    template: Template,
+    manifest: BuildManifest = None,
+    block_cache: BlockCache = None,
+    parse_cache: ParseCache = None,
+    site_index: SiteIndex = None,
+    asset_link: str = "reflink",
+    asset_compare: str = "stat",
+) -> None:
+    """
+    Rebuilds the outputs affected by a set of changed source paths: changed
+    markdown files are re-rendered, changed static files are published with
+    sync_asset_files, and the outputs of deleted sources are removed.
+
+    Args:
+        changed: Changed, added or deleted source paths.
+        dir_path_content: The content directory.
+        dest_dir_path: The output directory.
+        static_dir_path: The static files directory.
+        template: The compiled HTML template.
+        manifest: Optional build manifest updated with the rebuilt pages.
+        block_cache: Optional cache of rendered blocks.
+        parse_cache: Optional on-disk cache of rendered page bodies.
+        site_index: Optional site index updated with the rebuilt pages.
+        asset_link: How static files are published, as for sync_assets.
+        asset_compare: How unchanged static files are detected, as for sync_assets.
+    """
+    assets = []
+    for path in sorted(changed):
+        if path.is_relative_to(dir_path_content):
+            output_file_path = dest_dir_path.joinpath(
+                path.relative_to(dir_path_content)
+            ).with_suffix(".html")
+            if not path.exists():
+                output_file_path.unlink(missing_ok=True)
+                if manifest is not None:
+                    manifest.discard(path)
+                if site_index is not None:
+                    site_index.discard(path.relative_to(dir_path_content).as_posix())
+                continue
+            output_file_path.parent.mkdir(parents=True, exist_ok=True)
+            content_hash, metadata = generate_page_file(
+                path, output_file_path, template, None, block_cache, parse_cache
+            )
+            if manifest is not None:
+                manifest.record(path, content_hash)
+            if site_index is not None:
+                site_index.update(
+                    PageRecord.for_page(
+                        path, output_file_path, dir_path_content, dest_dir_path, content_hash, metadata
+                    )
+                )
+        elif path.is_relative_to(static_dir_path):
+            assets.append(path)
+    if assets:
+        records = manifest.assets if manifest is not None else {}
+        copied = sync_asset_files(static_dir_path, dest_dir_path, assets, records, asset_link, asset_compare)
+        build_log.debug(f"Published {copied} of {len(assets)} changed static files")
+
+
+def generate_pages_recursive(
+    dir_path_content: Path,
+    template_path: Path,
+    dest_dir_path: Path,
+    manifest: BuildManifest = None,
+    workers: int = 1,
+    block_cache: BlockCache = None,
+    parse_cache: ParseCache = None,
+    site_index: SiteIndex = None,
+    changed_images: set[str] = None,
+) -> None:
+    """
+    Renders every file under dir_path_content into dest_dir_path.
+
+    Args:
+        dir_path_content: The markdown file or directory to render.
+        template_path: The HTML template every page is rendered into.
+        dest_dir_path: The output path mirroring dir_path_content.
+        manifest: Optional build manifest used to skip unchanged pages.
+        workers: Number of worker processes. A value of 1 renders in this process.
+        block_cache: Optional cache of rendered blocks shared by all pages. In a
+            parallel build each worker keeps a cache of the same size and its
+            hit and miss counts are added to this one.
+        parse_cache: Optional on-disk cache of rendered page bodies, shared
+            by the workers of a parallel build.
+        site_index: Optional site index updated with every rendered page.
+            Pages missing from it are rendered even if the manifest shows
+            them up to date, and pages that no longer exist are removed.
+        changed_images: Optional URL paths of images whose attributes
+            changed, as returned by ImageSizes.refresh. Pages the site index
+            shows them on are rendered even if the manifest shows them up
+            to date.
+    """
+    if not (dir_path_content.exists() and template_path.exists()):
+        return
+
+    with profiling.stage("scan"):
+        pages = collect_pages(dir_path_content, dest_dir_path)
+        template = Template.from_file(template_path)
+
+    sources = [source for source, _ in pages]
+    outputs = [output for _, output in pages]
+    if site_index is None:
+        forced = [False] * len(pages)
+    else:
+        relative_sources = [source.relative_to(dir_path_content).as_posix() for source in sources]
+        shown = images.pages_showing(site_index.records.values(), changed_images)
+        forced = [relative not in site_index or relative in shown for relative in relative_sources]
+        site_index.retain(relative_sources)
+
+    def record(source: Path, output: Path, content_hash: str, metadata: PageMetadata) -> None:
+        if manifest is not None:
+            manifest.record(source, content_hash)
+        if site_index is not None and metadata is not None:
+            site_index.update(
+                PageRecord.for_page(source, output, dir_path_content, dest_dir_path, content_hash, metadata)
+            )
+
+    if workers > 1 and len(pages) > 1:
+        with process_pool(
+            max_workers=workers,
+            initializer=_init_page_worker,
+            initargs=(
+                template,
+                manifest,
+                block_cache.maxsize if block_cache is not None else 0,
+                parse_cache,
+                build_log.active_log.level,
+                images.active_sizes,
+            ),
+        ) as executor:
+            chunksize = max(1, len(pages) // (workers * 4))
+            results = executor.map(
+                _generate_page_worker, sources, outputs, forced, chunksize=chunksize
+            )
+            for done, (source, output, (content_hash, metadata, block_counts, parse_counts)) in enumerate(
+                zip(sources, outputs, results), 1
+            ):
+                record(source, output, content_hash, metadata)
+                _add_counts(block_cache, block_counts)
+                _add_counts(parse_cache, parse_counts)
+                build_log.progress(done, len(pages))
+        build_log.end_progress()
+        return
+
+    for done, (source, output, force) in enumerate(zip(sources, outputs, forced), 1):
+        content_hash, metadata = generate_page_file(
+            source, output, template, None if force else manifest, block_cache, parse_cache
+        )
+        record(source, output, content_hash, metadata)
+        build_log.progress(done, len(pages))
+    build_log.end_progress()
+
+
+def collect_pages(dir_path_content: Path, dest_dir_path: Path) -> list[tuple[Path, Path]]:
+    """
+    Walks dir_path_content depth-first, creating the mirrored output directories.
+
+    Args:
+        dir_path_content: The markdown file or directory to walk.
+        dest_dir_path: The output path mirroring dir_path_content.
+
+    Returns:
+        A list of (markdown source, HTML output) path pairs.
+    """
+    if dir_path_content.is_file():
+        return [(dir_path_content, dest_dir_path.with_suffix(".html"))]
+
+    dest_dir_path.mkdir(parents=False, exist_ok=True)
+    pages = []
+    for child in dir_path_content.glob("*"):
+        pages.extend(collect_pages(child, dest_dir_path.joinpath(child.parts[-1])))
+    return pages
+
+
+def generate_page_file(
+    source: Path,
+    output_file_path: Path,
+    template: Template,
+    manifest: BuildManifest = None,
+    block_cache: BlockCache = None,
+    parse_cache: ParseCache = None,
+) -> tuple[str, PageMetadata]:
+    """
+    Renders a single markdown file into output_file_path unless the manifest
+    shows it is already up to date. Sources of stream_threshold bytes or more
+    are rendered block by block straight from the file, so their memory use
+    does not grow with their size.
+
+    Args:
+        source: The markdown file to render.
+        output_file_path: The HTML file to write.
+        template: The compiled HTML template the page is rendered into.
+        manifest: Optional build manifest used to skip unchanged pages.
+        block_cache: Optional cache of rendered blocks shared across pages.
+        parse_cache: Optional on-disk cache of rendered page bodies. Streamed
+            sources bypass it.
+
+    Returns:
+        The content hash of the markdown source and the PageMetadata of the
+        page, or None for the metadata if the page was already up to date.
+    """
+    page_start = time.perf_counter()
+    if source.stat().st_size >= stream_threshold:
+        content_hash = hash_file(source)
+        if manifest is not None and manifest.is_unchanged(source, content_hash, output_file_path):
+            return content_hash, None
+        with source.open("r") as markdown_file, Path(output_file_path).open("w") as html_file:
+            metadata = render_page_stream(markdown_file, template, html_file, block_cache)
+        if profiling.active_profiler is not None:
+            profiling.active_profiler.record_page(
+                source,
+                time.perf_counter() - page_start,
+                source.stat().st_size,
+                Path(output_file_path).stat().st_size,
+            )
+        build_log.debug(f"{output_file_path} written")
+        return content_hash, metadata
+
+    with profiling.stage("read"):
+        with source.open("r") as markdown_file:
+            markdown_content = markdown_file.read()
+        content_hash = hash_bytes(markdown_content.encode())
+    if manifest is not None and manifest.is_unchanged(source, content_hash, output_file_path):
+        return content_hash, None
+
+    profiler = profiling.active_profiler
+    if profiler is None:
+        with Path(output_file_path).open("w") as html_file:
+            metadata = render_page(
+                markdown_content, template, html_file, block_cache, parse_cache, content_hash
+            )
+    else:
+        # Render into memory first so serialization and writing are timed apart.
+        buffer = io.StringIO()
+        metadata = render_page(markdown_content, template, buffer, block_cache, parse_cache, content_hash)
+        page_content = buffer.getvalue()
+        with profiling.stage("write"):
+            with Path(output_file_path).open("w") as html_file:
+                html_file.write(page_content)
+        profiler.record_page(
+            source,
+            time.perf_counter() - page_start,
+            len(markdown_content.encode()),
+            len(page_content.encode()),
+        )
+
+    build_log.debug(f"{output_file_path} written")
+    return content_hash, metadata
+
+
+def render_page(
+    markdown_content: str,
+    template: Template,
+    stream,
+    block_cache: BlockCache = None,
+    parse_cache: ParseCache = None,
+    content_hash: str = None,
+) -> PageMetadata:
+    """
+    Renders a markdown page into a template, streaming the result. The
+    template is filled with the page's Title, Content and front matter values.
+
+    Args:
+        markdown_content: The markdown source of the page.
+        template: The compiled HTML template.
+        stream: A text stream the page is written to.
+        block_cache: Optional cache of rendered blocks shared across pages.
+        parse_cache: Optional on-disk cache of rendered page bodies. A cached
+            body is filled into the template without parsing the markdown.
+        content_hash: The content hash of markdown_content, the parse cache
+            key. Computed when not given.
+
+    Returns:
+        The PageMetadata of the page.
+    """
+    if parse_cache is None:
+        body, metadata = markdown_to_page(markdown_content, block_cache, images.image_props)
+    else:
+        if content_hash is None:
+            content_hash = hash_bytes(markdown_content.encode())
+        with profiling.stage("cache"):
+            cached = parse_cache.get(content_hash)
+        if cached is None:
+            html_node, metadata = markdown_to_page(markdown_content, block_cache, images.image_props)
+            with profiling.stage("serialize"):
+                body = html_node.to_html()
+            with profiling.stage("cache"):
+                parse_cache.put(content_hash, body, metadata)
+        else:
+            body, metadata = cached
+    with profiling.stage("serialize"):
+        template.write(stream, metadata.template_values(body))
+    return metadata
+
+
+def render_page_stream(
+    markdown_file, template: Template, stream, block_cache: BlockCache = None
+) -> PageMetadata:
+    """
+    Renders a markdown file into a template one block at a time. The file is
+    read twice: once for the metadata, which the template may need before the
+    content, and once while the blocks are rendered.
+
+    Args:
+        markdown_file: An open, seekable markdown text file.
+        template: The compiled HTML template.
+        stream: A text stream the page is written to.
+        block_cache: Optional cache of rendered blocks shared across pages.
+
+    Returns:
+        The PageMetadata of the page.
+    """
+    with profiling.stage("metadata"):
+        metadata = read_page_metadata(markdown_file)
+    markdown_file.seek(0)
+    _, lines = split_front_matter_lines(markdown_file)
+    content = MarkdownStream(iter_blocks(lines), block_cache, images.image_props)
+    with profiling.stage("serialize"):
+        template.write(stream, metadata.template_values(content))
+    return metadata
+
+
+# State installed in each worker process of the parallel build.
+_worker_state = {}
+
+
+def _init_page_worker(
+    template: Template,
+    manifest: BuildManifest,
+    block_cache_size: int,
+    parse_cache: ParseCache,
+    log_level: int,
+    image_sizes: ImageSizes,
+) -> None:
+    build_log.configure(level=log_level, progress=False)
+    images.enable(image_sizes)
+    _worker_state["template"] = template
+    _worker_state["manifest"] = manifest
+    _worker_state["block_cache"] = BlockCache(block_cache_size) if block_cache_size > 0 else None
+    if parse_cache is not None:
+        parse_cache.hits = parse_cache.misses = 0
+    _worker_state["parse_cache"] = parse_cache
+
+
+def _generate_page_worker(
+    source: Path, output_file_path: Path, force: bool
+) -> tuple[str, PageMetadata, tuple[int, int], tuple[int, int]]:
+    block_cache = _worker_state["block_cache"]
+    parse_cache = _worker_state["parse_cache"]
+    content_hash, metadata = generate_page_file(
+        source,
+        output_file_path,
+        _worker_state["template"],
+        None if force else _worker_state["manifest"],
+        block_cache,
+        parse_cache,
+    )
+    # Workers may exit without running atexit hooks, so write each page's messages.
+    build_log.flush()
+    return content_hash, metadata, _take_counts(block_cache), _take_counts(parse_cache)
+
+
+def _take_counts(cache) -> tuple[int, int]:
+    # Returns and resets a worker cache's hit and miss counts.
+    if cache is None:
+        return 0, 0
+    counts = cache.hits, cache.misses
+    cache.hits = cache.misses = 0
+    return counts
+
+
+def _add_counts(cache, counts: tuple[int, int]) -> None:
+    if cache is not None:
+        cache.hits += counts[0]
+        cache.misses += counts[1]
 
 
 def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    build_log.debug(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
     # Read files from_path and template_path
     with open(from_path, "r") as markdown_file:
         markdown_content = markdown_file.read()
-    with open(template_path, "r") as template_file:
-        template_content = template_file.read()
+    template = Template.from_file(template_path)
 
-    node = markdown_to_html_node(markdown_content)
+    node, metadata = markdown_to_page(markdown_content, image_props=images.image_props)
     html_content = node.to_html()
 
-    title = extract_title(markdown_content)
-    template_content = template_content.replace("{{ Title }}", title).replace(
-        "{{ Content }}", html_content
-    )
+    page_content = template.render(metadata.template_values(html_content))
 
     dir_name = os.path.dirname(dest_path)
     os.makedirs(dir_name, exist_ok=True)
     with open(dest_path, "w") as html_file:
-        html_file.write(template_content)
-
-
-def extract_title(markdown: str) -> str:
-    lines = markdown.split("\n")
-    for line in lines:
-        if line.startswith("# "):
-            return line.replace("# ", "")
+        html_file.write(page_content)
 
 
 def copy_files(src_path: str, dst_path: str) -> None:
@@ -79,7 +842,7 @@ def copy_files(src_path: str, dst_path: str) -> None:
     try:
         if os.path.isfile(src_path):
             shutil.copy2(src_path, dst_path)  # Copy with metadata
-            print(f"Copied file: {src_path} to {dst_path}")
+            build_log.debug(f"Copied file: {src_path} to {dst_path}")
         elif os.path.isdir(src_path):
             os.makedirs(dst_path, exist_ok=True)
             for item in os.listdir(src_path):
@@ -90,9 +853,9 @@ def copy_files(src_path: str, dst_path: str) -> None:
             raise FileNotFoundError(f"Invalid path: {src_path}")
 
     except PermissionError as e:
-        print(f"Error: Insufficient permissions - {e}")
+        build_log.error(f"Error: Insufficient permissions - {e}")
     except (shutil.Error, FileNotFoundError) as e:
-        print(f"Error copying files: {e}")
+        build_log.error(f"Error copying files: {e}")
 
 
 if __name__ == "__main__":
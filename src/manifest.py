@@ -0,0 +1,123 @@
+import hashlib
+import json
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Computes the content hash used to detect changed build inputs.
+
+    Args:
+        data: The raw bytes to hash.
+
+    Returns:
+        The hex digest of the data.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    """
+    Computes the content hash of a file, reading it in chunks so large files
+    are never held in memory whole.
+
+    Args:
+        path: The file to hash.
+
+    Returns:
+        The hex digest of the file contents.
+    """
+    with Path(path).open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+class BuildManifest:
+    """
+    Records the content hash of every markdown source rendered by a build,
+    together with the hash of the template used, so that later builds can skip
+    pages whose inputs did not change. It also keeps the list of static assets
+    published by the previous build, so assets removed from the source can be
+    removed from the output.
+
+    Args:
+        path (Path): Where the manifest is stored between builds.
+        template_hash (str): The content hash of the template used by this build.
+            When it differs from the stored one every page is rebuilt.
+    """
+
+    def __init__(self, path: Path, template_hash: str) -> None:
+        self.path = Path(path)
+        self.template_hash = template_hash
+        self.pages = {}
+        data = self._load()
+        self.assets = data.get("assets", {})
+        if data.get("template") == self.template_hash:
+            self._previous_pages = data.get("pages", {})
+        else:
+            self._previous_pages = {}
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open("r") as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data
+
+    def is_unchanged(self, source: Path, content_hash: str, output_path: Path) -> bool:
+        """
+        Determines whether a page can be skipped.
+
+        Args:
+            source: The markdown source of the page.
+            content_hash: The current content hash of the source.
+            output_path: The HTML file the page renders to.
+
+        Returns:
+            True if the page was built from identical inputs and its output still exists.
+        """
+        return (
+            self._previous_pages.get(str(source)) == content_hash
+            and Path(output_path).exists()
+        )
+
+    def record(self, source: Path, content_hash: str) -> None:
+        """
+        Records that a page is up to date with the given source hash.
+
+        Args:
+            source: The markdown source of the page.
+            content_hash: The content hash the page was built from.
+        """
+        self.pages[str(source)] = content_hash
+
+    def discard(self, source: Path) -> None:
+        """
+        Removes a page, for example because its source was deleted.
+
+        Args:
+            source: The markdown source of the page.
+        """
+        self.pages.pop(str(source), None)
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk. Only pages recorded during this build are
+        kept, so sources deleted since the previous build drop out of it.
+        """
+        data = {
+            "version": MANIFEST_VERSION,
+            "template": self.template_hash,
+            "pages": self.pages,
+            "assets": self.assets,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w") as manifest_file:
+            json.dump(data, manifest_file, indent=1, sort_keys=True)
+        tmp_path.replace(self.path)
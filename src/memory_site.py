@@ -0,0 +1,194 @@
+import hashlib
+import io
+import mimetypes
+import os
+import threading
+import time
+from pathlib import Path
+
+from block_cache import BlockCache
+from main import render_page
+from template import Template
+
+
+class SiteEntry:
+    """
+    A rendered page or static file held in memory.
+
+    Args:
+        body (bytes): The response body.
+        content_type (str): The MIME type of the body.
+        source (Path): The file the body was produced from.
+        source_mtime_ns (int): The modification time of the source when rendered.
+    """
+
+    __slots__ = ("body", "etag", "content_type", "source", "source_mtime_ns", "checked_at")
+
+    def __init__(self, body: bytes, content_type: str, source: Path, source_mtime_ns: int) -> None:
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        self.content_type = content_type
+        self.source = source
+        self.source_mtime_ns = source_mtime_ns
+        self.checked_at = time.monotonic()
+
+
+class MemorySite:
+    """
+    The whole site rendered into a map of URL path to response body, so a dev
+    server can answer requests without touching the output directory.
+
+    Every page is rendered up front. A request re-renders a page only if its
+    markdown source or the template changed; sources are checked at most once
+    per check_interval so repeated requests are served straight from memory.
+
+    Args:
+        dir_path_content (Path): The content directory.
+        template_path (Path): The HTML template.
+        static_dir_path (Path): The static files directory.
+        check_interval (float): Seconds between checks of a source for changes.
+        block_cache (BlockCache, optional): Cache of rendered blocks shared by all pages.
+    """
+
+    def __init__(
+        self,
+        dir_path_content: Path,
+        template_path: Path,
+        static_dir_path: Path,
+        check_interval: float = 0.2,
+        block_cache: BlockCache = None,
+    ) -> None:
+        self.dir_path_content = Path(dir_path_content)
+        self.template_path = Path(template_path)
+        self.static_dir_path = Path(static_dir_path)
+        self.check_interval = check_interval
+        self.block_cache = block_cache
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._template = Template.from_file(self.template_path)
+        self._template_mtime_ns = self.template_path.stat().st_mtime_ns
+        self._template_checked_at = time.monotonic()
+        self._scanned_at = time.monotonic()
+        for source in set(self.scan().values()):
+            self._store(self._load(source))
+
+    def scan(self) -> dict[str, Path]:
+        """
+        Maps every URL the site serves to its source file.
+
+        Returns:
+            A mapping of URL path to markdown or static source file.
+        """
+        routes = {}
+        for root in (self.static_dir_path, self.dir_path_content):
+            for dir_path, _, file_names in os.walk(root):
+                for file_name in file_names:
+                    source = Path(dir_path, file_name)
+                    for url in self.urls_for(source):
+                        routes[url] = source
+        return routes
+
+    def urls_for(self, source: Path) -> list[str]:
+        """
+        Lists the URL paths a source file is served at. A page rendered to
+        index.html is also served at its directory URL.
+
+        Args:
+            source: A markdown file under the content directory or a static file.
+
+        Returns:
+            The URL paths of the source.
+        """
+        if source.is_relative_to(self.dir_path_content):
+            relative = source.relative_to(self.dir_path_content).with_suffix(".html")
+        else:
+            relative = source.relative_to(self.static_dir_path)
+        url = "/" + relative.as_posix()
+        if relative.name == "index.html":
+            return [url, url[: -len("index.html")]]
+        return [url]
+
+    def get(self, url: str) -> SiteEntry:
+        """
+        Looks up the response for a URL path, re-rendering it first if its
+        source changed.
+
+        Args:
+            url: The request path, without query string.
+
+        Returns:
+            The SiteEntry for the URL, or None if the site has no such path.
+        """
+        entry = self.entries.get(url)
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+            return entry
+        with self._lock:
+            self._check_template()
+            entry = self.entries.get(url)
+            if entry is not None:
+                source = entry.source
+            elif time.monotonic() - self._scanned_at >= self.check_interval:
+                # The URL may belong to a source added since the last scan.
+                self._scanned_at = time.monotonic()
+                source = self.scan().get(url)
+                if source is None:
+                    return None
+            else:
+                return None
+            try:
+                mtime_ns = source.stat().st_mtime_ns
+            except FileNotFoundError:
+                for source_url in self.urls_for(source):
+                    self.entries.pop(source_url, None)
+                return None
+            if entry is None or entry.source_mtime_ns != mtime_ns:
+                entry = self._store(self._load(source))
+            entry.checked_at = time.monotonic()
+            return entry
+
+    def directory_url(self, url: str) -> str:
+        """
+        Finds the directory URL a request path without its trailing slash
+        should be redirected to, as a file server redirects "/blog" to
+        "/blog/".
+
+        Args:
+            url: The request path, without query string.
+
+        Returns:
+            The URL path with a trailing slash, or None if url names no
+            directory index page.
+        """
+        if url.endswith("/") or self.get(url + "/") is None:
+            return None
+        return url + "/"
+
+    def _store(self, entry: SiteEntry) -> SiteEntry:
+        for url in self.urls_for(entry.source):
+            self.entries[url] = entry
+        return entry
+
+    def _check_template(self) -> None:
+        if time.monotonic() - self._template_checked_at < self.check_interval:
+            return
+        self._template_checked_at = time.monotonic()
+        mtime_ns = self.template_path.stat().st_mtime_ns
+        if mtime_ns == self._template_mtime_ns:
+            return
+        self._template = Template.from_file(self.template_path)
+        self._template_mtime_ns = mtime_ns
+        # Force every page to re-render on its next request.
+        for entry in self.entries.values():
+            if entry.source.is_relative_to(self.dir_path_content):
+                entry.source_mtime_ns = None
+
+    def _load(self, source: Path) -> SiteEntry:
+        mtime_ns = source.stat().st_mtime_ns
+        if not source.is_relative_to(self.dir_path_content):
+            content_type = mimetypes.guess_type(source.name)[0] or "application/octet-stream"
+            return SiteEntry(source.read_bytes(), content_type, source, mtime_ns)
+        with source.open("r") as markdown_file:
+            markdown_content = markdown_file.read()
+        stream = io.StringIO()
+        render_page(markdown_content, self._template, stream, self.block_cache)
+        return SiteEntry(stream.getvalue().encode(), "text/html", source, mtime_ns)
@@ -0,0 +1,179 @@
+import itertools
+from collections.abc import Iterable, Iterator
+
+from patterns import front_matter_pattern
+
+
+class PageMetadata:
+    """
+    Metadata about a page, collected while its blocks are parsed so the
+    markdown never has to be read again for templates, indexes or feeds.
+
+    Args:
+        front_matter (dict, optional): The key/value pairs of the page's
+            front matter header.
+
+    Attributes:
+        title (str): The "title" front matter value, or else the text of the
+            first level 1 heading. None if the page has neither.
+        front_matter (dict): The front matter key/value pairs.
+        headings (list): A (level, text) pair for every heading in order.
+        words (int): The approximate number of words on the page, counted
+            as whitespace-separated tokens.
+        links (list): The URL of every link on the page, excluding images.
+        images (list): The URL of every image on the page.
+    """
+
+    __slots__ = ("title", "front_matter", "headings", "words", "links", "images")
+
+    def __init__(self, front_matter: dict = None) -> None:
+        self.front_matter = front_matter if front_matter is not None else {}
+        self.title = self.front_matter.get("title")
+        self.headings = []
+        self.words = 0
+        self.links = []
+        self.images = []
+
+    def add_heading(self, level: int, text: str) -> None:
+        """
+        Records a heading. The first level 1 heading becomes the title unless
+        the front matter set one.
+
+        Args:
+            level: The heading level, 1 to 6.
+            text: The heading text without its leading "#" characters.
+        """
+        self.headings.append((level, text))
+        if level == 1 and self.title is None:
+            self.title = text
+
+    def template_values(self, content) -> dict:
+        """
+        Returns the values the page fills into template placeholders: every
+        front matter key plus Title and Content, which take precedence over
+        front matter keys of the same name.
+
+        Args:
+            content: The rendered page body, a string or a node with a
+                write_html method.
+        """
+        values = dict(self.front_matter)
+        values["Title"] = self.title if self.title is not None else ""
+        values["Content"] = content
+        return values
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "front_matter": self.front_matter,
+            "headings": self.headings,
+            "words": self.words,
+            "links": self.links,
+            "images": self.images,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageMetadata":
+        metadata = cls(data["front_matter"])
+        metadata.title = data["title"]
+        metadata.headings = [tuple(heading) for heading in data["headings"]]
+        metadata.words = data["words"]
+        metadata.links = data["links"]
+        metadata.images = data["images"]
+        return metadata
+
+    def __eq__(self, other_object: object) -> bool:
+        if not isinstance(other_object, PageMetadata):
+            return False
+        return self.to_dict() == other_object.to_dict()
+
+    def __repr__(self) -> str:
+        return (
+            f"PageMetadata(title={self.title!r}, front_matter={self.front_matter!r}, "
+            f"headings={self.headings!r}, words={self.words}, links={self.links!r}, "
+            f"images={self.images!r})"
+        )
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+    Separates the front matter header from a markdown document. The header
+    is a block of "key: value" lines between two "---" lines at the very
+    start of the document. A header that does not parse is ordinary content.
+
+    Args:
+        markdown: The markdown document.
+
+    Returns:
+        The front matter key/value pairs and the markdown after the header.
+    """
+    if not markdown.startswith("---"):
+        return {}, markdown
+    match = front_matter_pattern.match(markdown)
+    if match is None:
+        return {}, markdown
+    try:
+        front_matter = parse_front_matter(match.group(1).splitlines())
+    except ValueError:
+        return {}, markdown
+    return front_matter, markdown[match.end():]
+
+
+def split_front_matter_lines(lines: Iterable[str]) -> tuple[dict, Iterator[str]]:
+    """
+    Separates the front matter header from a markdown document read line by
+    line, consuming only the header lines. A header that does not parse is
+    ordinary content.
+
+    Args:
+        lines: The lines of the document, such as an open text file.
+
+    Returns:
+        The front matter key/value pairs and an iterator over the remaining lines.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.rstrip() != "---":
+        return {}, itertools.chain([first], lines)
+    header = []
+    for line in lines:
+        if line.rstrip() == "---":
+            try:
+                return parse_front_matter(header), lines
+            except ValueError:
+                return {}, itertools.chain([first], header, [line], lines)
+        header.append(line)
+    # Without a closing line the document has no front matter.
+    return {}, itertools.chain([first], header)
+
+
+def parse_front_matter(lines: Iterable[str]) -> dict[str, str]:
+    """
+    Parses front matter lines of the form "key: value". Blank lines and lines
+    starting with "#" are skipped, and quotes around a value are removed.
+
+    Args:
+        lines: The lines between the "---" delimiters.
+
+    Returns:
+        The key/value pairs.
+
+    Raises:
+        ValueError: If a line is not a "key: value" pair.
+    """
+    front_matter = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, separator, value = line.partition(":")
+        key = key.strip()
+        if not separator or not key:
+            raise ValueError(f"Invalid front matter line: {line}")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        front_matter[key] = value
+    return front_matter
@@ -0,0 +1,18 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import build_log
+
+
+def process_pool(**kwargs) -> ProcessPoolExecutor:
+    """
+    Starts a process pool after flushing the build log, since forked workers
+    would otherwise inherit and repeat its buffered messages.
+
+    Args:
+        **kwargs: Arguments for the ProcessPoolExecutor.
+
+    Returns:
+        The executor, to be used as a context manager.
+    """
+    build_log.flush()
+    return ProcessPoolExecutor(**kwargs)
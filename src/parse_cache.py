@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import images
+from block_markdown import PARSER_VERSION
+from page_metadata import PageMetadata
+
+
+class ParseCache:
+    """
+    An on-disk cache of rendered page bodies and their metadata, keyed by the
+    content hash of the markdown source and the parser version. A build that
+    only changed the template fills the template from cached entries instead
+    of parsing every page again.
+
+    Each entry is a file holding the metadata and the attributes its images
+    were rendered with as a JSON line, followed by the body HTML. Entries
+    whose images would now render differently are treated as missing.
+    Entries are written atomically so worker processes of a parallel build
+    can share the cache directory. Reading an entry refreshes its
+    modification time, and evict removes the least recently used entries
+    once the cache grows past max_bytes.
+
+    Args:
+        directory (Path): The cache directory, created when first written to.
+        max_bytes (int): The total size of entries kept by evict.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, content_hash: str) -> Path:
+        """
+        Computes where the body rendered from a markdown source is stored.
+
+        Args:
+            content_hash: The content hash of the markdown source.
+
+        Returns:
+            The entry path, which includes the parser version so bodies
+            rendered by another parser version are never read back.
+        """
+        return self.directory / content_hash[:2] / f"{content_hash}.v{PARSER_VERSION}"
+
+    def get(self, content_hash: str) -> tuple[str, PageMetadata]:
+        """
+        Looks up the rendered body and metadata of a markdown source.
+
+        Args:
+            content_hash: The content hash of the markdown source.
+
+        Returns:
+            The cached body HTML and PageMetadata, or None if it is not cached.
+        """
+        path = self.path_for(content_hash)
+        try:
+            with path.open("r") as cache_file:
+                header = json.loads(cache_file.readline())
+                html = cache_file.read()
+            metadata = PageMetadata.from_dict(header["metadata"])
+            cached_images = header["images"]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            # Missing, truncated or otherwise malformed entries are rendered again.
+            self.misses += 1
+            return None
+        if cached_images != images.page_image_props(metadata.images):
+            # The images of the page changed since it was rendered.
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return html, metadata
+
+    def put(self, content_hash: str, html: str, metadata: PageMetadata) -> None:
+        """
+        Stores the rendered body and metadata of a markdown source.
+
+        Args:
+            content_hash: The content hash of the markdown source.
+            html: The rendered body HTML.
+            metadata: The PageMetadata collected while rendering.
+        """
+        path = self.path_for(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A per-process temporary name keeps concurrent workers from clashing.
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w") as cache_file:
+            header = {"metadata": metadata.to_dict(), "images": images.page_image_props(metadata.images)}
+            cache_file.write(json.dumps(header))
+            cache_file.write("\n")
+            cache_file.write(html)
+        tmp_path.replace(path)
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            The number of entries removed.
+        """
+        entries = []
+        total = 0
+        for dir_path, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.unlink(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __repr__(self) -> str:
+        return f"ParseCache({str(self.directory)!r}, hits={self.hits}, misses={self.misses})"
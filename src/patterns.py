@@ -0,0 +1,26 @@
+"""
+Compiled regular expressions shared by the block and inline markdown parsers.
+
+Compiling them once at import keeps the parsers off the re module's pattern
+cache, which is bounded and can be evicted by other code using re heavily.
+"""
+import re
+
+# Page level
+front_matter_pattern = re.compile(r"---[ \t]*\r?\n(.*?)^---[ \t]*(?:\r?\n|\Z)", re.M | re.S)
+
+# Block level
+blank_lines_pattern = re.compile(r"\n(?:[ \t]*\n)+")
+heading_pattern = re.compile(r"#{1,6}")
+ordered_list_pattern = re.compile(r"\d.")
+ordered_list_item_pattern = re.compile(r"^\d+\.")
+
+# Inline level
+# Link text and URLs cannot contain brackets or parentheses, so a stray "["
+# never reaches ahead to a later link and swallows the text before it.
+image_pattern = re.compile(r"!\[([^\[\]]*)\]\(([^()]*)\)")
+link_pattern = re.compile(r"\[([^\[\]]*)\]\(([^()]*)\)")
+inline_token_pattern = re.compile(r"\*\*?|`|!\[|\[")
+
+# Search
+search_term_pattern = re.compile(r"\w{2,}")
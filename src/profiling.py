@@ -0,0 +1,135 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# The profiler instrumented code reports to, or None when profiling is off.
+active_profiler = None
+_no_stage = nullcontext()
+
+
+class BuildProfiler:
+    """
+    Collects per-stage build timings, per-page times and I/O byte counts.
+
+    Stage times are exclusive: time spent in a nested stage is counted only
+    for the inner stage, so the stage totals add up to the instrumented time.
+
+    Args:
+        trace (bool): Also record every stage as an event for a Chrome trace.
+    """
+
+    def __init__(self, trace: bool = False) -> None:
+        self.stage_totals = defaultdict(float)
+        self.stage_calls = defaultdict(int)
+        self.page_times = []
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.trace_events = [] if trace else None
+        self._child_time = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the enclosed code as the named stage.
+
+        Args:
+            name: The stage name, e.g. "read" or "inline".
+        """
+        start = time.perf_counter()
+        self._child_time.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_totals[name] += elapsed - self._child_time.pop()
+            self.stage_calls[name] += 1
+            if self._child_time:
+                self._child_time[-1] += elapsed
+            if self.trace_events is not None:
+                self.trace_events.append(
+                    {
+                        "name": name,
+                        "ph": "X",
+                        "ts": (start - self._origin) * 1e6,
+                        "dur": elapsed * 1e6,
+                        "pid": 0,
+                        "tid": 0,
+                    }
+                )
+
+    def record_page(self, source: Path, seconds: float, bytes_read: int, bytes_written: int) -> None:
+        """
+        Records the total render time and I/O of a page.
+
+        Args:
+            source: The markdown source of the page.
+            seconds: Time taken to render the page.
+            bytes_read: Bytes of markdown read.
+            bytes_written: Bytes of HTML written.
+        """
+        self.page_times.append((seconds, str(source)))
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+
+    def report(self, top: int = 10) -> str:
+        """
+        Formats the collected timings as a table.
+
+        Args:
+            top: How many of the slowest pages to list.
+
+        Returns:
+            The report text.
+        """
+        total = sum(self.stage_totals.values())
+        lines = [f"{'stage':<12} {'seconds':>10} {'share':>7} {'calls':>9}"]
+        for name, seconds in sorted(self.stage_totals.items(), key=lambda item: -item[1]):
+            share = seconds / total if total else 0.0
+            lines.append(f"{name:<12} {seconds:>10.4f} {share:>7.1%} {self.stage_calls[name]:>9}")
+        lines.append(f"{'total':<12} {total:>10.4f}")
+        lines.append("")
+        lines.append(f"Slowest {min(top, len(self.page_times))} of {len(self.page_times)} pages:")
+        for seconds, source in sorted(self.page_times, reverse=True)[:top]:
+            lines.append(f"  {seconds:>8.4f}s  {source}")
+        lines.append("")
+        lines.append(f"Bytes read: {self.bytes_read:,}  Bytes written: {self.bytes_written:,}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """
+        Writes the recorded stage events in the Chrome trace event format,
+        viewable in chrome://tracing or Perfetto.
+
+        Args:
+            path: The JSON file to write.
+        """
+        with Path(path).open("w") as trace_file:
+            json.dump({"traceEvents": self.trace_events or []}, trace_file)
+
+
+def stage(name: str):
+    """
+    Times the enclosed code as the named stage of the active profiler. Does
+    nothing when profiling is off.
+
+    Args:
+        name: The stage name.
+    """
+    if active_profiler is None:
+        return _no_stage
+    return active_profiler.stage(name)
+
+
+def enable(profiler: BuildProfiler) -> None:
+    """Makes profiler the active profiler."""
+    global active_profiler
+    active_profiler = profiler
+
+
+def disable() -> None:
+    """Turns profiling off."""
+    global active_profiler
+    active_profiler = None
@@ -0,0 +1,272 @@
+import itertools
+import json
+import shutil
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from urllib.parse import quote
+
+import build_log
+from block_markdown import block_to_inline_texts, iter_blocks
+from inline_markdown import text_to_textnodes
+from page_metadata import split_front_matter_lines
+from parallel import process_pool
+from patterns import search_term_pattern
+from site_index import SiteIndex
+
+INDEX_VERSION = 1
+
+# Terms are sharded by their first characters, so looking up a prefix of at
+# least this length downloads a single shard.
+prefix_length = 2
+# Pages per file of the document table.
+docs_per_chunk = 1000
+
+
+def page_terms(lines: Iterable[str]) -> dict[str, int]:
+    """
+    Tokenizes a page into lowercase search terms of two or more word
+    characters. The text indexed is that of the TextNodes text_to_textnodes
+    produces for each block, so markdown syntax and link URLs are left out
+    while link text and image alt text are kept.
+
+    Args:
+        lines: The lines of the markdown document, such as an open text file.
+
+    Returns:
+        The number of occurrences of every term.
+    """
+    texts = []
+    _, lines = split_front_matter_lines(lines)
+    for block in iter_blocks(lines):
+        for text in block_to_inline_texts(block):
+            texts.append("".join(node.text for node in text_to_textnodes(text)))
+    # Tokenizing the page's text at once avoids a regex call per node.
+    return dict(Counter(search_term_pattern.findall("\n".join(texts).lower())))
+
+
+def page_terms_file(source: Path) -> dict[str, int]:
+    """
+    Tokenizes a markdown file with page_terms, reading it line by line.
+
+    Args:
+        source: The markdown file.
+
+    Returns:
+        The number of occurrences of every term.
+    """
+    with Path(source).open("r") as markdown_file:
+        return page_terms(markdown_file)
+
+
+def shard_file_name(key: str) -> str:
+    """
+    Names the term shard holding the terms that start with key, as
+    encodeURIComponent would encode it on the client.
+
+    Args:
+        key: The first prefix_length characters of the terms.
+
+    Returns:
+        The file name of the shard.
+    """
+    return f"{quote(key, safe='')}.json"
+
+
+class SearchIndex:
+    """
+    A full-text search index for searching the site in the browser, written
+    as small JSON files so a client downloads only the parts a query needs:
+
+    * index.json: the format, prefix_length, docs_per_chunk and the keys of
+      every term shard.
+    * terms/<key>.json: every term starting with key, mapped to a flat list
+      of document id and occurrence count pairs ordered by document id.
+      Prefix queries of at least prefix_length characters read one shard.
+    * docs/<n>.json: the [url, title] of documents n * docs_per_chunk
+      onwards, or null for unused ids.
+
+    The per-page state kept in state_path records each page's document id,
+    content hash and the shards its terms are in. Updates only tokenize pages
+    whose content hash changed, on a process pool for parallel builds, and
+    only rewrite the shards and document chunks those pages touch.
+
+    Args:
+        state_path (Path): Where the per-page state is stored between builds.
+        output_dir (Path): The directory the index is published to.
+        dir_path_content (Path): The content directory indexed pages are read from.
+    """
+
+    def __init__(self, state_path: Path, output_dir: Path, dir_path_content: Path) -> None:
+        self.state_path = Path(state_path)
+        self.output_dir = Path(output_dir)
+        self.dir_path_content = Path(dir_path_content)
+        self.pages = self._load()
+
+    def _load(self) -> dict:
+        pages = {}
+        try:
+            with self.state_path.open("r") as state_file:
+                header = json.loads(state_file.readline())
+                if header != {"version": INDEX_VERSION, "prefix_length": prefix_length}:
+                    return {}
+                for line in state_file:
+                    entry = json.loads(line)
+                    pages[entry.pop("source")] = entry
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+        return pages
+
+    def update(self, site_index: SiteIndex, workers: int = 1) -> int:
+        """
+        Brings the published index up to date with the site index, then
+        saves the per-page state. Without state, or without a published
+        index.json, the index is rebuilt from scratch.
+
+        Args:
+            site_index: The site index of the build.
+            workers: Number of worker processes used to tokenize pages.
+
+        Returns:
+            The number of pages tokenized.
+        """
+        records = site_index.records
+        if not self.pages or not (self.output_dir / "index.json").exists():
+            # Shards that cannot be matched to page state cannot be patched.
+            self.pages = {}
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+        removed = self.pages.keys() - records.keys()
+        changed = sorted(
+            source
+            for source, record in records.items()
+            if source not in self.pages or self.pages[source]["content_hash"] != record.content_hash
+        )
+        renamed = [
+            source
+            for source, entry in self.pages.items()
+            if source in records
+            and (entry["url"], entry["title"]) != (records[source].url, records[source].title)
+        ]
+        if not (removed or changed or renamed) and self.state_path.exists():
+            return 0
+
+        dirty_shards = set()
+        dirty_chunks = set()
+        rewritten_ids = set()
+        for source in itertools.chain(removed, changed):
+            entry = self.pages.get(source)
+            if entry is not None:
+                dirty_shards.update(entry["shards"])
+                rewritten_ids.add(entry["id"])
+        for source in removed:
+            dirty_chunks.add(self.pages.pop(source)["id"] // docs_per_chunk)
+
+        used_ids = {entry["id"] for entry in self.pages.values()}
+        free_ids = (doc_id for doc_id in itertools.count() if doc_id not in used_ids)
+        postings = defaultdict(lambda: defaultdict(list))
+        for source, terms in zip(changed, self._tokenize(changed, workers)):
+            entry = self.pages.get(source)
+            if entry is None:
+                entry = self.pages[source] = {"id": next(free_ids)}
+                rewritten_ids.add(entry["id"])
+            shards = set()
+            for term, count in terms.items():
+                key = term[:prefix_length]
+                shards.add(key)
+                postings[key][term].extend((entry["id"], count))
+            entry["content_hash"] = records[source].content_hash
+            entry["shards"] = sorted(shards)
+            dirty_shards.update(shards)
+        for source in itertools.chain(changed, renamed):
+            entry = self.pages[source]
+            entry["url"] = records[source].url
+            entry["title"] = records[source].title
+            dirty_chunks.add(entry["id"] // docs_per_chunk)
+
+        live_ids = {entry["id"] for entry in self.pages.values()}
+        for key in dirty_shards:
+            self._write_shard(key, postings.get(key, {}), rewritten_ids, live_ids)
+        documents = {entry["id"]: entry for entry in self.pages.values()}
+        for chunk in dirty_chunks:
+            self._write_chunk(chunk, documents)
+        self._write_manifest()
+        self.save()
+        return len(changed)
+
+    def _tokenize(self, sources: list[str], workers: int) -> Iterator[dict[str, int]]:
+        paths = [self.dir_path_content / source for source in sources]
+        if workers > 1 and len(paths) > 1:
+            with process_pool(max_workers=workers) as executor:
+                chunksize = max(1, len(paths) // (workers * 4))
+                yield from executor.map(page_terms_file, paths, chunksize=chunksize)
+            return
+        for path in paths:
+            yield page_terms_file(path)
+
+    def _write_shard(self, key: str, postings: dict, rewritten_ids: set, live_ids: set) -> None:
+        path = self.output_dir / "terms" / shard_file_name(key)
+        try:
+            with path.open("r", encoding="utf-8") as shard_file:
+                terms = json.load(shard_file)
+        except FileNotFoundError:
+            terms = {}
+        merged = {}
+        for term in sorted(terms.keys() | postings.keys()):
+            old = terms.get(term, [])
+            pairs = [
+                (old[i], old[i + 1])
+                for i in range(0, len(old), 2)
+                if old[i] in live_ids and old[i] not in rewritten_ids
+            ]
+            new = postings.get(term, [])
+            pairs.extend(zip(new[::2], new[1::2]))
+            if pairs:
+                pairs.sort()
+                merged[term] = [number for pair in pairs for number in pair]
+        if not merged:
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(merged, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    def _write_chunk(self, chunk: int, documents: dict) -> None:
+        path = self.output_dir / "docs" / f"{chunk}.json"
+        first_id = chunk * docs_per_chunk
+        rows = []
+        for doc_id in range(first_id, first_id + docs_per_chunk):
+            entry = documents.get(doc_id)
+            rows.append(None if entry is None else [entry["url"], entry["title"]])
+        while rows and rows[-1] is None:
+            rows.pop()
+        if not rows:
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(rows, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    def _write_manifest(self) -> None:
+        shards = set()
+        for entry in self.pages.values():
+            shards.update(entry["shards"])
+        manifest = {
+            "version": INDEX_VERSION,
+            "prefix_length": prefix_length,
+            "docs_per_chunk": docs_per_chunk,
+            "shards": sorted(shards),
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "index.json").write_text(
+            json.dumps(manifest, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+        )
+
+    def save(self) -> None:
+        """Writes the per-page state to disk."""
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with tmp_path.open("w") as state_file:
+            state_file.write(json.dumps({"version": INDEX_VERSION, "prefix_length": prefix_length}) + "\n")
+            for source, entry in sorted(self.pages.items()):
+                state_file.write(json.dumps({"source": source, **entry}, separators=(",", ":")) + "\n")
+        tmp_path.replace(self.state_path)
+
+    def __len__(self) -> int:
+        return len(self.pages)
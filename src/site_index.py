@@ -0,0 +1,200 @@
+import json
+from pathlib import Path
+
+from page_metadata import PageMetadata
+
+INDEX_VERSION = 2
+
+
+class PageRecord:
+    """
+    The indexed metadata of one page.
+
+    Args:
+        source (str): The markdown source, relative to the content directory.
+        url (str): The URL path the page is served at.
+        title (str): The page title.
+        content_hash (str): The content hash of the markdown source.
+        words (int): The approximate number of words on the page.
+        links (list[str]): The URL of every link on the page.
+        images (list[str]): The URL of every image on the page.
+        mtime_ns (int): The modification time of the source when indexed.
+        front_matter (dict): The front matter key/value pairs of the page.
+    """
+
+    __slots__ = ("source", "url", "title", "content_hash", "words", "links", "images", "mtime_ns", "front_matter")
+
+    def __init__(
+        self,
+        source: str,
+        url: str,
+        title: str,
+        content_hash: str,
+        words: int,
+        links: list[str],
+        images: list[str],
+        mtime_ns: int,
+        front_matter: dict,
+    ) -> None:
+        self.source = source
+        self.url = url
+        self.title = title
+        self.content_hash = content_hash
+        self.words = words
+        self.links = links
+        self.images = images
+        self.mtime_ns = mtime_ns
+        self.front_matter = front_matter
+
+    @classmethod
+    def for_page(
+        cls,
+        source: Path,
+        output_file_path: Path,
+        dir_path_content: Path,
+        dest_dir_path: Path,
+        content_hash: str,
+        metadata: PageMetadata,
+    ) -> "PageRecord":
+        """
+        Builds the record of a page just rendered.
+
+        Args:
+            source: The markdown file.
+            output_file_path: The HTML file it was rendered to.
+            dir_path_content: The content directory.
+            dest_dir_path: The output directory.
+            content_hash: The content hash of the markdown file.
+            metadata: The PageMetadata collected while rendering.
+
+        Returns:
+            The PageRecord of the page.
+        """
+        relative_output = Path(output_file_path).relative_to(dest_dir_path).as_posix()
+        url = "/" + relative_output
+        if url.endswith("/index.html"):
+            url = url[: -len("index.html")]
+        return cls(
+            Path(source).relative_to(dir_path_content).as_posix(),
+            url,
+            metadata.title,
+            content_hash,
+            metadata.words,
+            metadata.links,
+            metadata.images,
+            Path(source).stat().st_mtime_ns,
+            metadata.front_matter,
+        )
+
+    @property
+    def section(self) -> str:
+        """The directory of the source relative to the content directory, "" at the top."""
+        directory, _, _ = self.source.rpartition("/")
+        return directory
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageRecord":
+        return cls(**{name: data[name] for name in cls.__slots__})
+
+    def __eq__(self, other_object: object) -> bool:
+        if not isinstance(other_object, PageRecord):
+            return False
+        return self.to_dict() == other_object.to_dict()
+
+    def __repr__(self) -> str:
+        return f"PageRecord({self.source!r}, url={self.url!r}, title={self.title!r})"
+
+
+class SiteIndex:
+    """
+    A persistent index of every page under the content directory, stored as
+    a JSON-lines file: a header line followed by one PageRecord per line.
+
+    Builds update the records of the pages they render and leave the others
+    as loaded, so sitemap, feed and listing generators can query the index
+    instead of re-reading every page.
+
+    Args:
+        path (Path): Where the index is stored between builds.
+
+    Attributes:
+        records (dict): PageRecords keyed by source path.
+        changed (set): Source paths whose records were added, updated or
+            removed since the index was loaded or last saved.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.records = self._load()
+        self.changed = set()
+
+    def _load(self) -> dict:
+        records = {}
+        try:
+            with self.path.open("r") as index_file:
+                header = json.loads(index_file.readline())
+                if header.get("version") != INDEX_VERSION:
+                    return {}
+                for line in index_file:
+                    record = PageRecord.from_dict(json.loads(line))
+                    records[record.source] = record
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+        return records
+
+    def update(self, record: PageRecord) -> None:
+        """
+        Adds or replaces the record of a page.
+
+        Args:
+            record: The new record.
+        """
+        if self.records.get(record.source) != record:
+            self.records[record.source] = record
+            self.changed.add(record.source)
+
+    def discard(self, source: str) -> None:
+        """
+        Removes the record of a page if present.
+
+        Args:
+            source: The source path relative to the content directory.
+        """
+        if self.records.pop(source, None) is not None:
+            self.changed.add(source)
+
+    def retain(self, sources) -> None:
+        """
+        Removes the records of every page not in sources.
+
+        Args:
+            sources: The source paths, relative to the content directory, of
+                every page that still exists.
+        """
+        for source in self.records.keys() - set(sources):
+            self.discard(source)
+
+    def pages(self) -> list[PageRecord]:
+        """Returns every record, ordered by URL."""
+        return sorted(self.records.values(), key=lambda record: record.url)
+
+    def save(self) -> None:
+        """Writes the index to disk if it changed or does not exist yet."""
+        if not self.changed and self.path.exists():
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w") as index_file:
+            index_file.write(json.dumps({"version": INDEX_VERSION}) + "\n")
+            for record in self.pages():
+                index_file.write(json.dumps(record.to_dict(), separators=(",", ":")) + "\n")
+        tmp_path.replace(self.path)
+        self.changed = set()
+
+    def __contains__(self, source: str) -> bool:
+        return source in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
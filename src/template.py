@@ -0,0 +1,80 @@
+import re
+from collections.abc import Mapping
+from pathlib import Path
+
+placeholder_pattern = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """
+    An HTML template compiled once into static segments and placeholder slots.
+
+    Placeholders are written as "{{ Name }}". Rendering joins the static
+    segments with the slot values, so its cost does not grow with the number
+    of placeholders the way chained str.replace calls do.
+
+    Args:
+        source (str): The template text.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.segments = []
+        self.slots = []
+        self._placeholders = []
+        position = 0
+        for match in placeholder_pattern.finditer(source):
+            self.segments.append(source[position:match.start()])
+            self.slots.append(match.group(1))
+            self._placeholders.append(match.group(0))
+            position = match.end()
+        self.segments.append(source[position:])
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Template":
+        """
+        Reads and compiles a template file.
+
+        Args:
+            path: The template file.
+
+        Returns:
+            The compiled Template.
+        """
+        with Path(path).open("r") as template_file:
+            return cls(template_file.read())
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """
+        Fills the placeholder slots with the given values.
+
+        Args:
+            values: Slot values keyed by placeholder name. Placeholders without
+                a value are left in the output unchanged.
+
+        Returns:
+            The rendered document.
+        """
+        parts = [self.segments[0]]
+        for slot, placeholder, segment in zip(self.slots, self._placeholders, self.segments[1:]):
+            parts.append(values.get(slot, placeholder))
+            parts.append(segment)
+        return "".join(parts)
+
+    def write(self, stream, values: Mapping) -> None:
+        """
+        Streams the rendered document into a text stream.
+
+        Args:
+            stream: A text stream, such as an open file, with a write method.
+            values: Slot values keyed by placeholder name. A value may be a
+                string or a node with a write_html method, which is streamed
+                directly instead of being serialized to a string first.
+        """
+        stream.write(self.segments[0])
+        for slot, placeholder, segment in zip(self.slots, self._placeholders, self.segments[1:]):
+            value = values.get(slot, placeholder)
+            if isinstance(value, str):
+                stream.write(value)
+            else:
+                value.write_html(stream)
+            stream.write(segment)
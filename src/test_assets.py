@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import build_log
+from assets import sync_asset_files, sync_assets
+
+
+class TestSyncAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.static = self.root / "static"
+        self.public = self.root / "public"
+        (self.static / "images").mkdir(parents=True)
+        (self.static / "index.css").write_text("body {}")
+        (self.static / "images" / "logo.png").write_bytes(b"\x89PNG")
+        self.public.mkdir()
+        (self.public / "index.html").write_text("<p>page</p>")
+        self.previous_log = build_log.active_log
+        build_log.configure(stream=io.StringIO())
+
+    def tearDown(self):
+        build_log.active_log = self.previous_log
+        self.tmp_dir.cleanup()
+
+    def test_copies_new_assets(self):
+        records = sync_assets(self.static, self.public, link_mode="copy")
+        self.assertEqual(set(records), {"index.css", "images/logo.png"})
+        self.assertEqual((self.public / "index.css").read_text(), "body {}")
+        self.assertEqual((self.public / "images" / "logo.png").read_bytes(), b"\x89PNG")
+
+    def test_skips_unchanged_assets(self):
+        sync_assets(self.static, self.public, link_mode="copy")
+        copied = self.public / "index.css"
+        mtime_ns = copied.stat().st_mtime_ns
+        copied.write_text("BODY {}")
+        os.utime(copied, ns=(mtime_ns, mtime_ns))
+        sync_assets(self.static, self.public, link_mode="copy")
+        self.assertEqual(copied.read_text(), "BODY {}")
+
+    def test_recopies_changed_assets(self):
+        sync_assets(self.static, self.public)
+        (self.static / "index.css").write_text("body { color: red; }")
+        sync_assets(self.static, self.public, compare="hash")
+        self.assertEqual((self.public / "index.css").read_text(), "body { color: red; }")
+
+    def test_removes_orphaned_assets_only(self):
+        records = sync_assets(self.static, self.public)
+        (self.static / "images" / "logo.png").unlink()
+        sync_assets(self.static, self.public, previous=records)
+        self.assertFalse((self.public / "images").exists())
+        self.assertTrue((self.public / "index.html").exists())
+        self.assertTrue((self.public / "index.css").exists())
+
+    def test_hardlink(self):
+        sync_assets(self.static, self.public, link_mode="hardlink")
+        self.assertEqual(
+            (self.public / "index.css").stat().st_ino,
+            (self.static / "index.css").stat().st_ino,
+        )
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            sync_assets(self.static, self.public, link_mode="symlink")
+        with self.assertRaises(ValueError):
+            sync_asset_files(self.static, self.public, [], {}, compare="size")
+
+    def test_sync_changed_files(self):
+        records = sync_assets(self.static, self.public, link_mode="hardlink")
+        css = self.static / "index.css"
+        css.write_text("body { color: red; }")
+        (self.static / "new.js").write_text("run()")
+        (self.static / "images" / "logo.png").unlink()
+        (self.public / "stray.txt").write_text("")
+        changed = [css, self.static / "new.js", self.static / "images" / "logo.png", self.static / "stray.txt"]
+        self.assertEqual(sync_asset_files(self.static, self.public, changed, records, "hardlink"), 1)
+        self.assertEqual((self.public / "index.css").read_text(), "body { color: red; }")
+        self.assertEqual((self.public / "new.js").read_text(), "run()")
+        self.assertFalse((self.public / "images").exists())
+        self.assertTrue((self.public / "stray.txt").exists())
+        self.assertEqual(set(records), {"index.css", "new.js"})
+        self.assertEqual(records["new.js"][0], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
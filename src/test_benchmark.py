@@ -0,0 +1,32 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmark import compare_results, corpora, write_site
+from block_markdown import markdown_to_html_node
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_corpora_render(self):
+        for make_corpus in corpora.values():
+            markdown = make_corpus(0.01)
+            self.assertTrue(markdown_to_html_node(markdown).to_html().startswith("<div>"))
+
+    def test_write_site(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            content, template = write_site(Path(tmp_dir), 150)
+            self.assertEqual(len(list(content.rglob("*.md"))), 150)
+            self.assertTrue(template.exists())
+
+    def test_compare_results(self):
+        baseline = {"a.stage": 1.0, "b.stage": 1.0, "c.stage": 0.0001, "d.stage": 1.0}
+        results = {"a.stage": 1.05, "b.stage": 1.5, "c.stage": 0.0005, "e.stage": 9.0}
+        with contextlib.redirect_stdout(io.StringIO()):
+            regressions = compare_results(results, baseline, threshold=0.1)
+        self.assertEqual(regressions, ["b.stage"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+import block_markdown
+from block_cache import BlockCache
+from block_markdown import markdown_to_html_node, markdown_to_page
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = BlockCache(4)
+        self.assertIsNone(cache.get("# Title"))
+        cache.put("# Title", "<h1>Title</h1>")
+        self.assertEqual(cache.get("# Title"), ("<h1>Title</h1>", (), ()))
+        cache.put("[a](/a) ![b](/b.png)", "<p></p>", ["/a"], ["/b.png"])
+        self.assertEqual(cache.get("[a](/a) ![b](/b.png)"), ("<p></p>", ("/a",), ("/b.png",)))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_lru_eviction(self):
+        cache = BlockCache(2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")[0], "<p>a</p>")
+        self.assertEqual(cache.get("c")[0], "<p>c</p>")
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            BlockCache(0)
+
+    def test_shared_across_pages(self):
+        footer = "Copyright **Tolkien Fan Club**"
+        pages = [f"# Page {i}\n\n{footer}" for i in range(3)]
+        cache = BlockCache()
+        for page in pages:
+            self.assertEqual(
+                markdown_to_html_node(page, cache).to_html(),
+                markdown_to_html_node(page).to_html(),
+            )
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 4)
+
+    def test_cached_blocks_keep_links(self):
+        page = "See [the docs](/docs/) and ![a logo](/logo.png).\n\n* `[not](/a-link)` [b](/b)"
+        cache = BlockCache()
+        _, metadata = markdown_to_page(page, cache)
+        self.assertEqual(metadata.links, ["/docs/", "/b"])
+        self.assertEqual(metadata.images, ["/logo.png"])
+        # A page made of cached blocks is not parsed again.
+        with mock.patch.object(block_markdown, "text_to_textnodes", side_effect=AssertionError):
+            _, cached_metadata = markdown_to_page(page, cache)
+        self.assertEqual(cached_metadata, metadata)
+
+
+if __name__ == "__main__":
+    unittest.main()
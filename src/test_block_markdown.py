@@ -1,6 +1,10 @@
 import unittest
 
+import io
+
+from block_cache import BlockCache
 from block_markdown import (
+    MarkdownStream,
     block_type_paragraph,
     block_type_heading,
     block_type_code,
@@ -9,7 +13,11 @@ from block_markdown import (
     block_type_ordered_list,
     markdown_to_html_node,
     markdown_to_blocks,
-    block_to_block_type
+    block_to_block_type,
+    block_to_inline_texts,
+    block_to_html_node,
+    iter_blocks,
+    text_to_children,
 )
 
 
@@ -57,6 +65,25 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_markdown_to_blocks_blank_runs(self):
+        for count in range(2, 9):
+            md = "first" + "\n" * count + "second"
+            self.assertEqual(markdown_to_blocks(md), ["first", "second"])
+
+    def test_markdown_to_blocks_whitespace_lines(self):
+        md = "\n  \n# Title\n \t\n\n   \nSome text\nmore text\n\t\n"
+        self.assertEqual(markdown_to_blocks(md), ["# Title", "Some text\nmore text"])
+        self.assertEqual(markdown_to_blocks(" \n\n\t\n"), [])
+
+    def test_markdown_to_blocks_crlf(self):
+        md = "# Title\r\n\r\n\r\n* one\r\n* two\r\n  \r\nend\r\n"
+        self.assertEqual(markdown_to_blocks(md), ["# Title", "* one\n* two", "end"])
+        self.assertEqual(list(iter_blocks(md.splitlines(keepends=True))), markdown_to_blocks(md))
+
+    def test_blank_runs_do_not_make_empty_paragraphs(self):
+        node = markdown_to_html_node("first\n\n\n\n\n\nsecond")
+        self.assertEqual(node.to_html(), "<div><p>first</p><p>second</p></div>")
+
     def test_block_to_block_types(self):
         block = "# heading"
         self.assertEqual(block_to_block_type(block), block_type_heading)
@@ -71,6 +98,38 @@ This is the same paragraph on a new line
         block = "paragraph"
         self.assertEqual(block_to_block_type(block), block_type_paragraph)
 
+    def test_block_to_block_types_edge_cases(self):
+        self.assertEqual(block_to_block_type(""), block_type_paragraph)
+        self.assertEqual(block_to_block_type("####### seven"), block_type_heading)
+        self.assertEqual(block_to_block_type("*emphasis* first"), block_type_paragraph)
+        self.assertEqual(block_to_block_type("-dash"), block_type_paragraph)
+        self.assertEqual(block_to_block_type("``` unclosed"), block_type_paragraph)
+        self.assertEqual(block_to_block_type("7"), block_type_paragraph)
+
+    def test_block_to_inline_texts(self):
+        self.assertEqual(block_to_inline_texts("## A **bold** title"), ["A **bold** title"])
+        self.assertEqual(block_to_inline_texts("```\nx = 1\n```"), ["x = 1"])
+        self.assertEqual(block_to_inline_texts("> one\n> two"), ["one two"])
+        self.assertEqual(block_to_inline_texts("* a\n- b"), ["a", "b"])
+        self.assertEqual(block_to_inline_texts("1. a\n2. *b*"), ["a", "*b*"])
+        self.assertEqual(block_to_inline_texts("line one\nline two"), ["line one line two"])
+
+    def test_inline_texts_are_what_blocks_render(self):
+        blocks = ["## A **bold** title", "```\nx = 1\n```", "> one\n> *two*", "* a\n- [b](/b)", "1. a\n2. *b*", "p\nq"]
+        for block in blocks:
+            node = block_to_html_node(block)
+            items = node.children[0].children if node.tag == "pre" else node.children
+            if node.tag in ("ul", "ol"):
+                rendered = [[child.to_html() for child in item.children] for item in items]
+            else:
+                rendered = [[child.to_html() for child in items]]
+            expected = [[child.to_html() for child in text_to_children(text)] for text in block_to_inline_texts(block)]
+            self.assertEqual(rendered, expected, block)
+
+    def test_invalid_quote_block(self):
+        with self.assertRaises(ValueError):
+            block_to_inline_texts("> one\ntwo", block_type_quote)
+
     def test_paragraph(self):
         md = """
 This is **bolded** paragraph
@@ -154,6 +213,40 @@ this is paragraph text
             "<div><blockquote>This is a blockquote block</blockquote><p>this is paragraph text</p></div>",
         )
 
+    def test_iter_blocks_matches_markdown_to_blocks(self):
+        md = """
+# Title
+
+ A paragraph
+on two lines   
+
+
+* a list
+* of items
+
+```
+code
+```
+"""
+        lines = io.StringIO(md)
+        self.assertEqual(list(iter_blocks(lines)), markdown_to_blocks(md))
+
+    def test_iter_blocks_is_lazy(self):
+        def lines():
+            yield "first block\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+
+        self.assertEqual(next(iter_blocks(lines())), "first block")
+
+    def test_markdown_stream_matches_tree(self):
+        md = "# Title\n\nSome *text*\n\n> quote\n\nSome *text*"
+        expected = markdown_to_html_node(md).to_html()
+        for cache in (None, BlockCache()):
+            stream = io.StringIO()
+            MarkdownStream(iter_blocks(md.split("\n")), cache).write_html(stream)
+            self.assertEqual(stream.getvalue(), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import io
+import unittest
+
+import build_log
+from build_log import BuildLog
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestBuildLog(unittest.TestCase):
+    def test_level_filtering(self):
+        stream = io.StringIO()
+        log = BuildLog(stream, level=build_log.WARNING)
+        log.log(build_log.INFO, "page written")
+        log.log(build_log.WARNING, "missing title")
+        log.flush()
+        self.assertEqual(stream.getvalue(), "missing title\n")
+
+    def test_messages_written_in_batches(self):
+        stream = CountingStream()
+        log = BuildLog(stream, batch_size=10)
+        for i in range(25):
+            log.log(build_log.INFO, f"line {i}")
+        self.assertEqual(stream.writes, 2)
+        log.flush()
+        self.assertEqual(stream.writes, 3)
+        self.assertEqual(stream.getvalue().count("\n"), 25)
+
+    def test_errors_written_at_once(self):
+        stream = io.StringIO()
+        log = BuildLog(stream)
+        log.log(build_log.INFO, "copied")
+        log.log(build_log.ERROR, "failed")
+        self.assertEqual(stream.getvalue(), "copied\nfailed\n")
+
+    def test_progress_redrawn_in_place(self):
+        stream = io.StringIO()
+        log = BuildLog(stream, progress=True, progress_interval=0)
+        log.progress(1, 2)
+        log.log(build_log.INFO, "note")
+        log.flush()
+        log.progress(2, 2)
+        log.end_progress()
+        self.assertEqual(
+            stream.getvalue(),
+            "\r\033[KRendered 1/2\r\033[Knote\nRendered 1/2\r\033[KRendered 2/2\n",
+        )
+
+    def test_progress_off_for_non_terminal(self):
+        stream = io.StringIO()
+        log = BuildLog(stream)
+        log.progress(1, 1)
+        log.end_progress()
+        self.assertEqual(stream.getvalue(), "")
+
+    def test_configure_flushes_previous_log(self):
+        stream = io.StringIO()
+        previous = build_log.active_log
+        try:
+            build_log.configure(stream=stream)
+            build_log.info("first")
+            build_log.configure(stream=io.StringIO())
+            self.assertEqual(stream.getvalue(), "first\n")
+        finally:
+            build_log.active_log = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
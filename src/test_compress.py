@@ -0,0 +1,64 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import build_log
+from compress import precompress
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.public = Path(self.tmp_dir.name)
+        (self.public / "blog").mkdir()
+        self.page = self.public / "blog" / "index.html"
+        self.page.write_text("<p>hello</p>" * 200)
+        (self.public / "small.css").write_text("body {}")
+        (self.public / "logo.png").write_bytes(b"\x89PNG" * 500)
+        self.previous_log = build_log.active_log
+        build_log.configure(stream=io.StringIO())
+
+    def tearDown(self):
+        build_log.active_log = self.previous_log
+        self.tmp_dir.cleanup()
+
+    def test_writes_gzip_sidecars(self):
+        precompress(self.public, min_size=1024, workers=1)
+        sidecar = self.public / "blog" / "index.html.gz"
+        self.assertEqual(gzip.decompress(sidecar.read_bytes()), self.page.read_bytes())
+        self.assertFalse((self.public / "small.css.gz").exists())
+        self.assertFalse((self.public / "logo.png.gz").exists())
+
+    def test_skips_fresh_sidecars(self):
+        self.assertGreaterEqual(precompress(self.public, workers=1), 1)
+        self.assertEqual(precompress(self.public, workers=1), 0)
+
+    def test_recompresses_stale_sidecars(self):
+        precompress(self.public, workers=1)
+        sidecar = self.public / "blog" / "index.html.gz"
+        old_mtime = sidecar.stat().st_mtime_ns - 10**9
+        os.utime(sidecar, ns=(old_mtime, old_mtime))
+        self.page.write_text("<p>changed</p>" * 200)
+        self.assertGreaterEqual(precompress(self.public, workers=1), 1)
+        self.assertEqual(gzip.decompress(sidecar.read_bytes()), self.page.read_bytes())
+
+    def test_removes_orphaned_sidecars(self):
+        precompress(self.public, workers=1)
+        self.page.unlink()
+        (self.public / "archive.tar.gz").write_bytes(b"data")
+        precompress(self.public, workers=1)
+        self.assertFalse((self.public / "blog" / "index.html.gz").exists())
+        self.assertTrue((self.public / "archive.tar.gz").exists())
+
+    def test_parallel(self):
+        for i in range(4):
+            (self.public / f"page{i}.html").write_text(f"<p>{i}</p>" * 500)
+        self.assertGreaterEqual(precompress(self.public, workers=2), 5)
+        self.assertTrue((self.public / "page3.html.gz").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import io
+
+from htmlnode import EMPTY_PROPS, HTMLNode, LeafNode, ParentNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -26,6 +28,19 @@ class TestHTMLNode(unittest.TestCase):
         expected_repr_str = f"HTMLNode(div, Hello, world!, None, {expected_props})"
         self.assertEqual(repr_str, expected_repr_str)
 
+    def test_slots(self):
+        node = HTMLNode("div", "Hello, world!")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertFalse(hasattr(LeafNode("p", "text"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", []), "__dict__"))
+
+    def test_empty_props_shared(self):
+        node = LeafNode("p", "text")
+        self.assertIs(node.props, EMPTY_PROPS)
+        self.assertIs(ParentNode("div", [node]).props, EMPTY_PROPS)
+        self.assertEqual(node.props_to_html(), "")
+        self.assertEqual(repr(node), "LeafNode(p, text, {})")
+
 class TestLeafNode(unittest.TestCase):
     def test_init(self):
         node = LeafNode(tag="div", value="Hello, world!", id="my-div")
@@ -115,6 +130,26 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             node.to_html()
 
+    def test_write_html(self):
+        node = ParentNode(
+            "div",
+            children=[
+                ParentNode("p", children=[LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                LeafNode("img", "", src="a.png"),
+            ],
+        )
+        stream = io.StringIO()
+        node.write_html(stream)
+        self.assertEqual(stream.getvalue(), '<div><p><b>Bold</b> text</p><img src="a.png"></img></div>')
+        self.assertEqual(node.to_html(), stream.getvalue())
+
+    def test_write_html_deep_nesting(self):
+        node = LeafNode("span", "leaf")
+        for _ in range(200):
+            node = ParentNode("div", children=[node])
+        html = node.to_html()
+        self.assertEqual(html, "<div>" * 200 + "<span>leaf</span>" + "</div>" * 200)
+
     def test_repr(self):
         node = ParentNode("div", children=[LeafNode("p", "This is a paragraph")], id="my-div")
         expected_props = {"id": "my-div"}
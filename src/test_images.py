@@ -0,0 +1,153 @@
+import os
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import images
+from images import ImageSizes, image_key, pages_showing, read_image_size, variant_path
+from main import generate_pages_recursive
+from manifest import BuildManifest, hash_file
+from site_index import SiteIndex
+from textnode import TextNode, text_node_to_html_node, text_type_image
+
+
+def png_bytes(width: int, height: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x0dIHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+
+def jpeg_bytes(width: int, height: int) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + b"\xff" + sof0 + b"\xff\xd9"
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, data: bytes):
+        path = self.root / "image"
+        path.write_bytes(data)
+        return read_image_size(path)
+
+    def test_formats(self):
+        self.assertEqual(self.read(png_bytes(1344, 896)), (1344, 896))
+        self.assertEqual(self.read(jpeg_bytes(640, 480)), (640, 480))
+        self.assertEqual(self.read(b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 8), (32, 16))
+
+    def test_unrecognised_and_truncated(self):
+        self.assertIsNone(self.read(b"not an image"))
+        self.assertIsNone(self.read(jpeg_bytes(640, 480)[:20]))
+        self.assertIsNone(self.read(b""))
+
+    def test_image_key_and_variant_path(self):
+        self.assertEqual(image_key("/images/a%20b.png?v=1"), "/images/a b.png")
+        self.assertIsNone(image_key("images/a.png"))
+        self.assertIsNone(image_key("https://example.com/a.png"))
+        self.assertEqual(variant_path("images/a.b.png", 480), "images/a.b-480w.png")
+
+
+class TestImageSizes(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.static = self.root / "static"
+        (self.static / "images").mkdir(parents=True)
+        (self.static / "images" / "a.png").write_bytes(png_bytes(800, 600))
+        (self.static / "index.css").write_text("")
+
+    def tearDown(self):
+        images.disable()
+        self.tmp_dir.cleanup()
+
+    def test_refresh_reports_changed_images(self):
+        sizes = ImageSizes(self.root / "sizes.json", self.static)
+        self.assertEqual(sizes.refresh(), {"/images/a.png"})
+        self.assertEqual(
+            sizes.image_props("/images/a.png"),
+            {"width": "800", "height": "600", "loading": "lazy", "decoding": "async"},
+        )
+        sizes.save()
+
+        sizes = ImageSizes(self.root / "sizes.json", self.static)
+        self.assertEqual(sizes.refresh(), set())
+        (self.static / "images" / "a.png").write_bytes(png_bytes(400, 300))
+        (self.static / "images" / "b.png").write_bytes(png_bytes(10, 10))
+        self.assertEqual(sizes.refresh(), {"/images/a.png", "/images/b.png"})
+        (self.static / "images" / "b.png").unlink()
+        self.assertEqual(sizes.refresh(), {"/images/b.png"})
+
+        # Turning the attributes off changes every image back.
+        sizes = ImageSizes(self.root / "sizes.json", self.static, attributes=False)
+        self.assertEqual(sizes.refresh(), {"/images/a.png"})
+        self.assertEqual(sizes.image_props("/images/a.png"), {})
+
+    def test_img_nodes_get_attributes(self):
+        sizes = ImageSizes(self.root / "sizes.json", self.static)
+        sizes.refresh()
+        node = TextNode("alt", text_type_image, "/images/a.png")
+        self.assertEqual(text_node_to_html_node(node).to_html(), '<img src="/images/a.png" alt="alt"></img>')
+        self.assertEqual(
+            text_node_to_html_node(node, sizes.image_props).to_html(),
+            '<img src="/images/a.png" alt="alt" width="800" height="600" loading="lazy" decoding="async"></img>',
+        )
+
+    @unittest.skipIf(images.Image is None, "Pillow is not installed")
+    def test_variants(self):
+        from PIL import Image
+
+        Image.new("RGB", (800, 600)).save(self.static / "images" / "a.png")
+        sizes = ImageSizes(self.root / "sizes.json", self.static, widths=[400, 1000])
+        sizes.refresh()
+        self.assertEqual(
+            sizes.image_props("/images/a.png")["srcset"], "/images/a-400w.png 400w, /images/a.png 800w"
+        )
+        dest = self.root / "public"
+        (dest / "images").mkdir(parents=True)
+        self.assertEqual(sizes.write_variants(dest), 1)
+        with Image.open(dest / "images" / "a-400w.png") as variant:
+            self.assertEqual(variant.size, (400, 300))
+        self.assertEqual(sizes.write_variants(dest), 0)
+
+        sizes = ImageSizes(self.root / "sizes.json", self.static)
+        sizes.variants = {"images/a.png": ["0", [400]]}
+        sizes.refresh()
+        sizes.write_variants(dest)
+        self.assertFalse((dest / "images" / "a-400w.png").exists())
+
+    def test_pages_showing_changed_images_are_rebuilt(self):
+        content = self.root / "content"
+        content.mkdir()
+        (content / "index.md").write_text("![a](/images/a.png)")
+        (content / "other.md").write_text("No images")
+        template = self.root / "template.html"
+        template.write_text("{{ Content }}")
+        dest = self.root / "public"
+        manifest_path = self.root / "manifest.json"
+        index = SiteIndex(self.root / "index.jsonl")
+        sizes = ImageSizes(self.root / "sizes.json", self.static)
+        images.enable(sizes)
+
+        def build():
+            changed = sizes.refresh()
+            manifest = BuildManifest(manifest_path, hash_file(template))
+            generate_pages_recursive(content, template, dest, manifest, site_index=index, changed_images=changed)
+            manifest.save()
+
+        build()
+        self.assertIn('width="800"', (dest / "index.html").read_text())
+        os.utime(dest / "other.html", ns=(0, 0))
+        (self.static / "images" / "a.png").write_bytes(png_bytes(400, 300))
+        self.assertEqual(pages_showing(index.records.values(), {"/images/a.png"}), {"index.md"})
+        build()
+        self.assertIn('width="400"', (dest / "index.html").read_text())
+        self.assertEqual((dest / "other.html").stat().st_mtime_ns, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
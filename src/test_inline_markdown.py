@@ -181,6 +181,20 @@ class TestSplitNodeLink(unittest.TestCase):
             new_nodes,
         )
 
+    def test_repeated_links(self):
+        node = TextNode("[link](url) then [link](url) then [link](url2)", text_type_text)
+        new_nodes = split_nodes_link([node])
+        self.assertListEqual(
+            [
+                TextNode("link", text_type_link, "url"),
+                TextNode(" then ", text_type_text),
+                TextNode("link", text_type_link, "url"),
+                TextNode(" then ", text_type_text),
+                TextNode("link", text_type_link, "url2"),
+            ],
+            new_nodes,
+        )
+
     def test_multiple_nodes(self):
         node1 = TextNode("This is text with a [link](url)", text_type_text)
         node2 = TextNode("This is text with a [link2](url2)", text_type_text)
@@ -263,6 +277,51 @@ class TestTextToTextNodes(unittest.TestCase):
         nodes = text_to_textnodes(text)
         self.assertEqual(nodes, expected_nodes)
 
+    def test_unclosed_delimiter(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This has **unclosed bold")
+
+    def test_code_is_not_formatted(self):
+        text = "Use `a*b*c` here"
+        expected_nodes = [
+            TextNode("Use ", text_type_text),
+            TextNode("a*b*c", text_type_code),
+            TextNode(" here", text_type_text),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_unmatched_brackets_are_text(self):
+        text = "A [bracket] and ![bang] with **bold**"
+        expected_nodes = [
+            TextNode("A [bracket] and ![bang] with ", text_type_text),
+            TextNode("bold", text_type_bold),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_stray_bracket_before_link(self):
+        text = "a [note] then *it* and [link](/x)"
+        expected_nodes = [
+            TextNode("a [note] then ", text_type_text),
+            TextNode("it", text_type_italic),
+            TextNode(" and ", text_type_text),
+            TextNode("link", text_type_link, "/x"),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_stray_bracket_before_image(self):
+        text = "Prices [USD] below. ![chart](/c.png)"
+        expected_nodes = [
+            TextNode("Prices [USD] below. ", text_type_text),
+            TextNode("chart", text_type_image, "/c.png"),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_nodes)
+
+    def test_many_spans(self):
+        text = " ".join(f"**b{i}** [l{i}](u{i})" for i in range(2000))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 2000 * 4 - 1)
+        self.assertEqual(nodes[-1], TextNode("l1999", text_type_link, "u1999"))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from link_graph import LinkGraph, published_paths, resolve_link
+from site_index import PageRecord, SiteIndex
+
+
+def make_record(source: str, url: str, links: list[str] = None, images: list[str] = None) -> PageRecord:
+    return PageRecord(source, url, source, "0" * 64, 1, links or [], images or [], 0, {})
+
+
+class TestResolveLink(unittest.TestCase):
+    def test_internal_links(self):
+        self.assertEqual(resolve_link("/blog/", "/majesty"), "/majesty")
+        self.assertEqual(resolve_link("/blog/", "post.html#intro"), "/blog/post.html")
+        self.assertEqual(resolve_link("/blog/post.html", "../images/a%20b.png?v=2"), "/images/a b.png")
+
+    def test_external_and_fragment_links(self):
+        self.assertIsNone(resolve_link("/", "https://example.com/"))
+        self.assertIsNone(resolve_link("/", "//cdn.example.com/x.js"))
+        self.assertIsNone(resolve_link("/", "mailto:me@example.com"))
+        self.assertIsNone(resolve_link("/", "#top"))
+
+
+class TestLinkGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.index = SiteIndex(self.root / "index.jsonl")
+        self.index.update(make_record("index.md", "/", ["/blog", "/missing.html", "https://example.com"]))
+        self.index.update(make_record("blog/index.md", "/blog/", ["post.html", "/feed.xml", "#top"]))
+        self.index.update(
+            make_record("blog/post.md", "/blog/post.html", ["/blog/index.html", "/"], ["/images/a.png", "b.png"])
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_backlinks(self):
+        graph = LinkGraph(self.index)
+        self.assertEqual([record.url for record in graph.backlinks("/blog/")], ["/", "/blog/post.html"])
+        self.assertEqual([record.url for record in graph.backlinks("/")], ["/blog/post.html"])
+        self.assertEqual(graph.backlinks("/nowhere/"), [])
+
+    def test_broken_links(self):
+        graph = LinkGraph(self.index)
+        broken = graph.broken_links(["feed.xml", "images/a.png"])
+        self.assertEqual(
+            [(record.source, href) for record, href in broken],
+            [("index.md", "/missing.html"), ("blog/post.md", "b.png")],
+        )
+
+    def test_published_paths(self):
+        dest = self.root / "public"
+        (dest / "images").mkdir(parents=True)
+        (dest / "index.html").write_text("")
+        (dest / "images" / "a.png").write_bytes(b"")
+        self.assertEqual(published_paths(dest), {"index.html", "images/a.png"})
+
+
+if __name__ == "__main__":
+    unittest.main()
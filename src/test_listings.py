@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from listings import page_updated, write_feed, write_section_listings, write_sitemap
+from site_index import PageRecord, SiteIndex
+
+
+def make_record(source: str, url: str, title: str, date: str = None) -> PageRecord:
+    front_matter = {"date": date} if date else {}
+    return PageRecord(source, url, title, "0" * 64, 1, [], [], 0, front_matter)
+
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.dest = self.root / "public"
+        self.dest.mkdir()
+        self.template = self.root / "template.html"
+        self.template.write_text("<h1>{{ Title }}</h1>{{ Content }}")
+        self.index = SiteIndex(self.root / "index.jsonl")
+        for record in (
+            make_record("index.md", "/", "Home", "2024-01-01"),
+            make_record("blog/index.md", "/blog/", "Blog", "2024-01-02"),
+            make_record("blog/old.md", "/blog/old.html", "Old & busted", "2024-02-01"),
+            make_record("blog/new.md", "/blog/new.html", "New", "2024-03-01T12:00:00+02:00"),
+        ):
+            self.index.update(record)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_page_updated(self):
+        self.assertEqual(page_updated(self.index.records["blog/old.md"]).isoformat(), "2024-02-01T00:00:00+00:00")
+        undated = make_record("a.md", "/a.html", "A")
+        self.assertEqual(page_updated(undated).year, 1970)
+
+    def test_sitemap(self):
+        sitemap = write_sitemap(self.index, self.dest, "https://example.com/").read_text()
+        self.assertIn("<url><loc>https://example.com/</loc><lastmod>2024-01-01</lastmod></url>", sitemap)
+        self.assertEqual(sitemap.count("<url>"), 4)
+
+    def test_feed_newest_first(self):
+        feed = write_feed(self.index, self.dest, "https://example.com", limit=2).read_text()
+        self.assertIn("<title>Home</title>", feed)
+        self.assertEqual(feed.count("<entry>"), 2)
+        self.assertLess(feed.index("https://example.com/blog/new.html"), feed.index("https://example.com/blog/old.html"))
+        self.assertIn("<title>Old &amp; busted</title>", feed)
+        self.assertNotIn("https://example.com/blog/</id>", feed)
+
+    def test_section_listings(self):
+        self.assertEqual(write_section_listings(self.index, self.dest, self.template), 2)
+        self.assertEqual(
+            (self.dest / "pages.html").read_text(),
+            '<h1>Home</h1><ul><li><a href="/blog/">Blog</a></li></ul>',
+        )
+        self.assertEqual(
+            (self.dest / "blog" / "pages.html").read_text(),
+            '<h1>Blog</h1><ul><li><a href="/blog/new.html">New</a></li>'
+            '<li><a href="/blog/old.html">Old &amp; busted</a></li></ul>',
+        )
+
+    def test_section_listings_only_rewrite_stale(self):
+        write_section_listings(self.index, self.dest, self.template)
+        self.index.save()
+        self.assertEqual(write_section_listings(self.index, self.dest, self.template), 0)
+
+        self.index.discard("blog/old.md")
+        self.assertEqual(write_section_listings(self.index, self.dest, self.template), 1)
+        self.assertNotIn("old.html", (self.dest / "blog" / "pages.html").read_text())
+
+        self.index.save()
+        future = self.template.stat().st_mtime_ns + 10**9
+        os.utime(self.template, ns=(future, future))
+        self.assertEqual(write_section_listings(self.index, self.dest, self.template), 2)
+
+    def test_empty_section_listing_removed(self):
+        write_section_listings(self.index, self.dest, self.template)
+        self.index.save()
+        for source in ("blog/index.md", "blog/old.md", "blog/new.md"):
+            self.index.discard(source)
+        write_section_listings(self.index, self.dest, self.template)
+        self.assertFalse((self.dest / "blog" / "pages.html").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import build_log
+import main
+from main import collect_pages, generate_pages_recursive, rebuild_changed
+from template import Template
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.content = self.root / "content"
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nSome **bold** text")
+        (self.content / "blog" / "index.md").write_text("# Blog\n\n* one\n* two")
+        (self.content / "blog" / "post.md").write_text("# Post\n\n> quoted")
+        self.template = self.root / "template.html"
+        self.template.write_text("<title>{{ Title }}</title><body>{{ Content }}</body>")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_collect_pages(self):
+        dest = self.root / "public"
+        pages = collect_pages(self.content, dest)
+        self.assertEqual(
+            sorted(output for _, output in pages),
+            [
+                dest / "blog" / "index.html",
+                dest / "blog" / "post.html",
+                dest / "index.html",
+            ],
+        )
+        self.assertTrue((dest / "blog").is_dir())
+
+    def test_parallel_matches_serial(self):
+        serial = self.root / "serial"
+        parallel = self.root / "parallel"
+        generate_pages_recursive(self.content, self.template, serial)
+        generate_pages_recursive(self.content, self.template, parallel, workers=2)
+
+        for path in serial.rglob("*.html"):
+            self.assertEqual(
+                path.read_bytes(),
+                (parallel / path.relative_to(serial)).read_bytes(),
+            )
+        self.assertEqual(
+            (serial / "index.html").read_text(),
+            "<title>Home</title><body><div><h1>Home</h1><p>Some <b>bold</b> text</p></div></body>",
+        )
+
+    def test_rebuild_changed(self):
+        dest = self.root / "public"
+        static = self.root / "static"
+        static.mkdir()
+        generate_pages_recursive(self.content, self.template, dest)
+        index_html = (dest / "index.html").read_text()
+
+        post = self.content / "blog" / "post.md"
+        post.write_text("# Edited")
+        (self.content / "blog" / "index.md").unlink()
+        (static / "site.css").write_text("body {}")
+        rebuild_changed(
+            {post, self.content / "blog" / "index.md", static / "site.css"},
+            self.content,
+            dest,
+            static,
+            Template.from_file(self.template),
+        )
+
+        self.assertIn("<h1>Edited</h1>", (dest / "blog" / "post.html").read_text())
+        self.assertFalse((dest / "blog" / "index.html").exists())
+        self.assertEqual((dest / "site.css").read_text(), "body {}")
+        self.assertEqual((dest / "index.html").read_text(), index_html)
+
+    def test_large_pages_streamed(self):
+        serial = self.root / "serial"
+        streamed = self.root / "streamed"
+        generate_pages_recursive(self.content, self.template, serial)
+        with mock.patch.object(main, "stream_threshold", 0):
+            generate_pages_recursive(self.content, self.template, streamed)
+
+        for path in serial.rglob("*.html"):
+            self.assertEqual(
+                path.read_bytes(),
+                (streamed / path.relative_to(serial)).read_bytes(),
+            )
+
+    def test_front_matter_fills_template(self):
+        (self.content / "blog" / "post.md").write_text(
+            "---\ntitle: A # Post\nauthor: Sam\n---\n# Post\n\n> quoted"
+        )
+        self.template.write_text("<title>{{ Title }}</title><p>{{ author }}</p>{{ Content }}")
+        dest = self.root / "public"
+        streamed = self.root / "streamed"
+        generate_pages_recursive(self.content, self.template, dest)
+        with mock.patch.object(main, "stream_threshold", 0):
+            generate_pages_recursive(self.content, self.template, streamed)
+
+        expected = (
+            "<title>A # Post</title><p>Sam</p>"
+            "<div><h1>Post</h1><blockquote>quoted</blockquote></div>"
+        )
+        self.assertEqual((dest / "blog" / "post.html").read_text(), expected)
+        self.assertEqual((streamed / "blog" / "post.html").read_text(), expected)
+
+    def test_untitled_page_and_reserved_front_matter_keys(self):
+        (self.content / "blog" / "post.md").write_text("---\nContent: front\nstream: s\n---\nNo heading")
+        dest = self.root / "public"
+        streamed = self.root / "streamed"
+        generate_pages_recursive(self.content, self.template, dest)
+        with mock.patch.object(main, "stream_threshold", 0):
+            generate_pages_recursive(self.content, self.template, streamed)
+
+        expected = "<title></title><body><div><p>No heading</p></div></body>"
+        self.assertEqual((dest / "blog" / "post.html").read_text(), expected)
+        self.assertEqual((streamed / "blog" / "post.html").read_text(), expected)
+
+    def test_main_without_template(self):
+        self.template.unlink()
+        cwd = os.getcwd()
+        previous_log = build_log.active_log
+        output = io.StringIO()
+        os.chdir(self.root)
+        try:
+            with contextlib.redirect_stdout(output), mock.patch.object(sys, "argv", ["main.py", "-q"]):
+                main.main()
+                build_log.flush()
+        finally:
+            os.chdir(cwd)
+            build_log.active_log = previous_log
+        self.assertIn("Template template.html not found", output.getvalue())
+        self.assertFalse((self.root / "public").exists())
+        self.assertFalse((self.root / ".build_manifest.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
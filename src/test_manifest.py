@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from manifest import BuildManifest, hash_bytes
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.manifest_path = self.root / "manifest.json"
+        self.output_path = self.root / "index.html"
+        self.output_path.write_text("<p>built</p>")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_unchanged_after_save(self):
+        manifest = BuildManifest(self.manifest_path, "template")
+        manifest.record("content/index.md", hash_bytes(b"# Hello"))
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path, "template")
+        self.assertTrue(
+            manifest.is_unchanged("content/index.md", hash_bytes(b"# Hello"), self.output_path)
+        )
+
+    def test_changed_content(self):
+        manifest = BuildManifest(self.manifest_path, "template")
+        manifest.record("content/index.md", hash_bytes(b"# Hello"))
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path, "template")
+        self.assertFalse(
+            manifest.is_unchanged("content/index.md", hash_bytes(b"# Bye"), self.output_path)
+        )
+
+    def test_changed_template(self):
+        manifest = BuildManifest(self.manifest_path, "template")
+        manifest.record("content/index.md", hash_bytes(b"# Hello"))
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path, "other template")
+        self.assertFalse(
+            manifest.is_unchanged("content/index.md", hash_bytes(b"# Hello"), self.output_path)
+        )
+
+    def test_missing_output(self):
+        manifest = BuildManifest(self.manifest_path, "template")
+        manifest.record("content/index.md", hash_bytes(b"# Hello"))
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path, "template")
+        self.assertFalse(
+            manifest.is_unchanged("content/index.md", hash_bytes(b"# Hello"), self.root / "gone.html")
+        )
+
+    def test_corrupt_manifest(self):
+        self.manifest_path.write_text("{not json")
+        manifest = BuildManifest(self.manifest_path, "template")
+        self.assertFalse(
+            manifest.is_unchanged("content/index.md", hash_bytes(b"# Hello"), self.output_path)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
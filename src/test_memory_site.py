@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from memory_site import MemorySite
+
+
+class TestMemorySite(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.content = self.root / "content"
+        self.static = self.root / "static"
+        (self.content / "blog").mkdir(parents=True)
+        self.static.mkdir()
+        (self.content / "index.md").write_text("# Home")
+        (self.content / "blog" / "post.md").write_text("# Post")
+        (self.static / "index.css").write_text("body {}")
+        self.template = self.root / "template.html"
+        self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+        self.site = MemorySite(self.content, self.template, self.static, check_interval=0)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def bump_mtime(self, path):
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_routes(self):
+        self.assertEqual(
+            set(self.site.entries),
+            {"/", "/index.html", "/blog/post.html", "/index.css"},
+        )
+        home = self.site.get("/")
+        self.assertEqual(home.body, b"<title>Home</title><div><h1>Home</h1></div>")
+        self.assertEqual(home.content_type, "text/html")
+        self.assertIs(home, self.site.get("/index.html"))
+        self.assertEqual(self.site.get("/index.css").body, b"body {}")
+        self.assertIsNone(self.site.get("/missing.html"))
+
+    def test_directory_url(self):
+        (self.content / "blog" / "index.md").write_text("# Blog")
+        self.assertIsNone(self.site.get("/blog"))
+        self.assertEqual(self.site.directory_url("/blog"), "/blog/")
+        self.assertIsNone(self.site.directory_url("/blog/"))
+        self.assertIsNone(self.site.directory_url("/blog/post.html"))
+        self.assertIsNone(self.site.directory_url("/missing"))
+
+    def test_rerenders_changed_page(self):
+        etag = self.site.get("/blog/post.html").etag
+        post = self.content / "blog" / "post.md"
+        post.write_text("# Edited")
+        self.bump_mtime(post)
+        entry = self.site.get("/blog/post.html")
+        self.assertEqual(entry.body, b"<title>Edited</title><div><h1>Edited</h1></div>")
+        self.assertNotEqual(entry.etag, etag)
+
+    def test_template_change(self):
+        self.template.write_text("<h6>{{ Title }}</h6>")
+        self.bump_mtime(self.template)
+        self.assertEqual(self.site.get("/").body, b"<h6>Home</h6>")
+
+    def test_new_and_deleted_pages(self):
+        (self.content / "about.md").write_text("# About")
+        self.assertEqual(self.site.get("/about.html").body, b"<title>About</title><div><h1>About</h1></div>")
+        (self.content / "about.md").unlink()
+        self.assertIsNone(self.site.get("/about.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import unittest
+from unittest import mock
+
+import block_markdown
+from block_markdown import markdown_to_html_node, markdown_to_page, read_page_metadata
+from page_metadata import PageMetadata, parse_front_matter, split_front_matter, split_front_matter_lines
+
+
+class TestPageMetadata(unittest.TestCase):
+    def test_split_front_matter(self):
+        md = '---\ntitle: "Hello: World"\ndate: 2024-01-02\n# a comment\n\ntags: a, b\n---\n# Heading\n'
+        front_matter, body = split_front_matter(md)
+        self.assertEqual(
+            front_matter,
+            {"title": "Hello: World", "date": "2024-01-02", "tags": "a, b"},
+        )
+        self.assertEqual(body, "# Heading\n")
+
+    def test_split_front_matter_crlf_and_empty(self):
+        self.assertEqual(split_front_matter("---\r\nkey: value\r\n---\r\ntext"), ({"key": "value"}, "text"))
+        self.assertEqual(split_front_matter("---\n---\ntext"), ({}, "text"))
+
+    def test_no_front_matter(self):
+        for md in ("# Title", "----\nkey: value\n----", "---\nkey: value\n\ntext"):
+            self.assertEqual(split_front_matter(md), ({}, md))
+
+    def test_invalid_front_matter(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a pair"])
+
+    def test_unparsed_header_is_content(self):
+        md = "---\nJust a note here\n---\n\nBody"
+        self.assertEqual(split_front_matter(md), ({}, md))
+        front_matter, lines = split_front_matter_lines(io.StringIO(md))
+        self.assertEqual((front_matter, "".join(lines)), ({}, md))
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>--- Just a note here ---</p><p>Body</p></div>",
+        )
+        self.assertEqual(read_page_metadata(io.StringIO(md)), markdown_to_page(md)[1])
+
+    def test_split_front_matter_lines(self):
+        for md in ("---\nkey: value\n---\n# Title\n", "# Title\n", "---\nkey: value\n# Title\n"):
+            front_matter, lines = split_front_matter_lines(io.StringIO(md))
+            expected_front_matter, body = split_front_matter(md)
+            self.assertEqual(front_matter, expected_front_matter)
+            self.assertEqual("".join(lines), body)
+
+    def test_title_strips_only_prefix(self):
+        _, metadata = markdown_to_page("Intro\n\n# C# # Notes\n\n# Second")
+        self.assertEqual(metadata.title, "C# # Notes")
+
+    def test_front_matter_title_wins(self):
+        _, metadata = markdown_to_page("---\ntitle: From front matter\n---\n# From heading")
+        self.assertEqual(metadata.title, "From front matter")
+        self.assertEqual(metadata.headings, [(1, "From heading")])
+
+    def test_headings_and_body(self):
+        md = "---\nauthor: Bilbo\n---\n# Title\n\n## Part *one*\n\ntext\n\n### Part two"
+        node, metadata = markdown_to_page(md)
+        self.assertEqual(metadata.headings, [(1, "Title"), (2, "Part *one*"), (3, "Part two")])
+        self.assertEqual(
+            metadata.template_values("<div></div>"),
+            {"author": "Bilbo", "Title": "Title", "Content": "<div></div>"},
+        )
+        self.assertNotIn("author", node.to_html())
+        self.assertEqual(read_page_metadata(io.StringIO(md)), metadata)
+
+    def test_template_values_override_front_matter(self):
+        _, metadata = markdown_to_page("---\nContent: front\nstream: s\n---\ntext")
+        self.assertEqual(
+            metadata.template_values("<p>text</p>"),
+            {"Content": "<p>text</p>", "stream": "s", "Title": ""},
+        )
+
+    def test_words_and_links(self):
+        md = "# Title\n\nSee [the docs](/docs/) and ![a logo](/logo.png), don't wait.\n\n```\n[not](/a-link)\n```"
+        _, metadata = markdown_to_page(md)
+        self.assertEqual(metadata.links, ["/docs/"])
+        self.assertEqual(metadata.images, ["/logo.png"])
+        self.assertEqual(metadata.words, 12)
+
+    def test_links_in_code_spans_are_ignored(self):
+        md = "Write `[text](/some/page)` for a link, like [this](/real/).\n\n* `![alt](/x.png)`"
+        with mock.patch.object(block_markdown, "text_to_textnodes", wraps=block_markdown.text_to_textnodes) as parse:
+            _, metadata = markdown_to_page(md)
+        # Each inline text is parsed once, for rendering and metadata alike.
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(metadata.links, ["/real/"])
+        self.assertEqual(metadata.images, [])
+        self.assertEqual(read_page_metadata(io.StringIO(md)), metadata)
+
+    def test_dict_round_trip(self):
+        metadata = PageMetadata({"title": "T"})
+        metadata.add_heading(2, "Section")
+        self.assertEqual(PageMetadata.from_dict(metadata.to_dict()), metadata)
+
+
+if __name__ == "__main__":
+    unittest.main()
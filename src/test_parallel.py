@@ -0,0 +1,23 @@
+import io
+import unittest
+
+import build_log
+from parallel import process_pool
+
+
+class TestProcessPool(unittest.TestCase):
+    def test_flushes_build_log_first(self):
+        stream = io.StringIO()
+        previous = build_log.active_log
+        try:
+            build_log.configure(stream=stream)
+            build_log.info("before the pool")
+            with process_pool(max_workers=1) as executor:
+                self.assertEqual(stream.getvalue(), "before the pool\n")
+                self.assertEqual(executor.submit(abs, -1).result(), 1)
+        finally:
+            build_log.active_log = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
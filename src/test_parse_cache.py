@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import images
+from images import ImageSizes
+from main import generate_pages_recursive
+from page_metadata import PageMetadata
+from parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_put(self):
+        cache = ParseCache(self.root / "cache")
+        metadata = PageMetadata({"title": "Home"})
+        metadata.add_heading(2, "Section")
+        self.assertIsNone(cache.get("ab" * 32))
+        cache.put("ab" * 32, "<div><p>text\n</p></div>", metadata)
+        self.assertEqual(cache.get("ab" * 32), ("<div><p>text\n</p></div>", metadata))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_malformed_entries_miss(self):
+        cache = ParseCache(self.root / "cache")
+        path = cache.path_for("ab" * 32)
+        path.parent.mkdir(parents=True)
+        for header in ("", "not json", "[]", '{"metadata": {}}', '{"images": []}'):
+            path.write_text(header + "\n<div></div>")
+            self.assertIsNone(cache.get("ab" * 32))
+        self.assertEqual((cache.hits, cache.misses), (0, 5))
+
+    def test_entries_keyed_by_parser_version(self):
+        cache = ParseCache(self.root / "cache")
+        self.assertIn(".v", cache.path_for("cd" * 32).name)
+
+    def test_evict_least_recently_used(self):
+        cache = ParseCache(self.root / "cache")
+        for i, content_hash in enumerate(["aa" * 32, "bb" * 32, "cc" * 32]):
+            cache.put(content_hash, "x" * 100, PageMetadata())
+            os.utime(cache.path_for(content_hash), ns=(i * 10**9, i * 10**9))
+        # Room for two of the three entries.
+        cache.max_bytes = 2 * cache.path_for("aa" * 32).stat().st_size
+        cache.get("aa" * 32)
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNotNone(cache.get("aa" * 32))
+        self.assertIsNone(cache.get("bb" * 32))
+        self.assertIsNotNone(cache.get("cc" * 32))
+
+    def test_entries_with_changed_images_miss(self):
+        cache = ParseCache(self.root / "cache")
+        metadata = PageMetadata()
+        metadata.images.append("/images/a.png")
+        cache.put("ab" * 32, '<img src="/images/a.png" alt="">', metadata)
+        sizes = ImageSizes(self.root / "sizes.json", self.root / "static")
+        sizes.props["/images/a.png"] = {"width": "2", "height": "1"}
+        images.enable(sizes)
+        try:
+            self.assertIsNone(cache.get("ab" * 32))
+        finally:
+            images.disable()
+        self.assertIsNotNone(cache.get("ab" * 32))
+
+    def test_clear(self):
+        cache = ParseCache(self.root / "cache")
+        cache.put("ab" * 32, "<div></div>", PageMetadata())
+        cache.clear()
+        self.assertIsNone(cache.get("ab" * 32))
+        cache.clear()
+
+    def test_template_change_reuses_bodies(self):
+        content = self.root / "content"
+        content.mkdir()
+        (content / "index.md").write_text("# Home\n\nSome **bold** text")
+        template = self.root / "template.html"
+        template.write_text("<body>{{ Content }}</body>")
+        cache = ParseCache(self.root / "cache")
+        generate_pages_recursive(content, template, self.root / "public", parse_cache=cache)
+
+        template.write_text("<main>{{ Content }}</main>")
+        generate_pages_recursive(content, template, self.root / "public", parse_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(
+            (self.root / "public" / "index.html").read_text(),
+            "<main><div><h1>Home</h1><p>Some <b>bold</b> text</p></div></main>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
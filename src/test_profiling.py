@@ -0,0 +1,65 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import profiling
+from block_markdown import markdown_to_html_node
+from profiling import BuildProfiler
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_nested_stages_are_exclusive(self):
+        profiler = BuildProfiler()
+        with profiler.stage("outer"):
+            time.sleep(0.01)
+            with profiler.stage("inner"):
+                time.sleep(0.02)
+        self.assertGreaterEqual(profiler.stage_totals["inner"], 0.02)
+        self.assertLess(profiler.stage_totals["outer"], 0.02)
+        self.assertEqual(profiler.stage_calls["outer"], 1)
+
+    def test_stage_is_noop_when_disabled(self):
+        with profiling.stage("split"):
+            pass
+        self.assertIsNone(profiling.active_profiler)
+
+    def test_markdown_stages_recorded(self):
+        profiler = BuildProfiler()
+        profiling.enable(profiler)
+        markdown_to_html_node("# Title\n\nSome **bold** text")
+        profiling.disable()
+        self.assertEqual(set(profiler.stage_totals), {"split", "tree", "inline"})
+        self.assertEqual(profiler.stage_calls["inline"], 2)
+
+    def test_report(self):
+        profiler = BuildProfiler()
+        with profiler.stage("read"):
+            pass
+        profiler.record_page(Path("content/a.md"), 0.5, 100, 250)
+        profiler.record_page(Path("content/b.md"), 0.1, 10, 25)
+        report = profiler.report(top=1)
+        self.assertIn("read", report)
+        self.assertIn("Slowest 1 of 2 pages", report)
+        self.assertIn("content/a.md", report)
+        self.assertNotIn("content/b.md", report)
+        self.assertIn("Bytes read: 110  Bytes written: 275", report)
+
+    def test_chrome_trace(self):
+        profiler = BuildProfiler(trace=True)
+        with profiler.stage("write"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, "trace.json")
+            profiler.write_chrome_trace(path)
+            events = json.loads(path.read_text())["traceEvents"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual((events[0]["name"], events[0]["ph"]), ("write", "X"))
+
+
+if __name__ == "__main__":
+    unittest.main()
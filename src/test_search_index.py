@@ -0,0 +1,113 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from search_index import SearchIndex, page_terms, shard_file_name
+from site_index import PageRecord, SiteIndex
+
+
+class TestPageTerms(unittest.TestCase):
+    def test_terms_from_text_nodes(self):
+        markdown = (
+            "---\ntitle: Ignored\n---\n"
+            "# The Ring\n\n"
+            "A **ring** to [rule them](/rings/) all, and ![an eye](/eye.png).\n\n"
+            "* one ring\n* `bind(ring)`"
+        )
+        terms = page_terms(markdown.splitlines(keepends=True))
+        self.assertEqual(terms["ring"], 4)
+        self.assertEqual(terms["rule"], 1)
+        self.assertEqual(terms["eye"], 1)
+        self.assertEqual(terms["bind"], 1)
+        self.assertNotIn("rings", terms)
+        self.assertNotIn("png", terms)
+        self.assertNotIn("ignored", terms)
+        self.assertNotIn("a", terms)
+
+    def test_shard_file_name(self):
+        self.assertEqual(shard_file_name("ri"), "ri.json")
+        self.assertEqual(shard_file_name("éa"), "%C3%A9a.json")
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.content = self.root / "content"
+        self.content.mkdir()
+        self.output = self.root / "public" / "search"
+        self.site_index = SiteIndex(self.root / "site.jsonl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_page(self, source: str, markdown: str, title: str) -> None:
+        path = self.content / source
+        path.write_text(markdown)
+        url = "/" + source.replace(".md", ".html")
+        self.site_index.update(PageRecord(source, url, title, str(hash(markdown)), 0, [], [], 0, {}))
+
+    def update(self, workers: int = 1) -> int:
+        index = SearchIndex(self.root / "search.jsonl", self.output, self.content)
+        return index.update(self.site_index, workers)
+
+    def read(self, *parts: str):
+        return json.loads(self.output.joinpath(*parts).read_text(encoding="utf-8"))
+
+    def test_build_and_incremental_update(self):
+        self.write_page("a.md", "# Alpha\n\nrings rings", "Alpha")
+        self.write_page("b.md", "# Beta\n\nring of power", "Beta")
+        self.assertEqual(self.update(), 2)
+
+        self.assertEqual(self.read("index.json")["shards"], ["al", "be", "of", "po", "ri"])
+        self.assertEqual(self.read("terms", "ri.json"), {"ring": [1, 1], "rings": [0, 2]})
+        self.assertEqual(self.read("docs", "0.json"), [["/a.html", "Alpha"], ["/b.html", "Beta"]])
+
+        # Nothing changed: nothing is tokenized or written.
+        self.assertEqual(self.update(), 0)
+
+        be_shard = self.output / "terms" / "be.json"
+        be_mtime = be_shard.stat().st_mtime_ns
+        self.write_page("a.md", "# Alpha\n\nrings and power", "Alpha")
+        self.assertEqual(self.update(), 1)
+        self.assertEqual(be_shard.stat().st_mtime_ns, be_mtime)
+        self.assertEqual(self.read("terms", "po.json"), {"power": [0, 1, 1, 1]})
+        self.assertEqual(self.read("terms", "ri.json"), {"ring": [1, 1], "rings": [0, 1]})
+
+    def test_removed_page_frees_its_id(self):
+        self.write_page("a.md", "alpha", "A")
+        self.write_page("b.md", "beta", "B")
+        self.update()
+        self.site_index.discard("a.md")
+        self.update()
+        self.assertFalse((self.output / "terms" / "al.json").exists())
+        self.assertEqual(self.read("docs", "0.json"), [None, ["/b.html", "B"]])
+        self.assertEqual(self.read("index.json")["shards"], ["be"])
+
+        self.write_page("c.md", "gamma", "C")
+        self.update()
+        self.assertEqual(self.read("terms", "ga.json"), {"gamma": [0, 1]})
+        self.assertEqual(self.read("docs", "0.json"), [["/c.html", "C"], ["/b.html", "B"]])
+
+    def test_lost_output_is_rebuilt(self):
+        self.write_page("a.md", "alpha", "A")
+        self.update()
+        (self.output / "index.json").unlink()
+        self.assertEqual(self.update(), 1)
+        self.assertEqual(self.read("terms", "al.json"), {"alpha": [0, 1]})
+
+    def test_parallel_matches_serial(self):
+        for i in range(6):
+            self.write_page(f"p{i}.md", f"page number{i} shared words", f"P{i}")
+        self.update(workers=2)
+        parallel = {path.name: path.read_text() for path in self.output.rglob("*.json")}
+        self.update()
+        (self.root / "search.jsonl").unlink()
+        self.update()
+        serial = {path.name: path.read_text() for path in self.output.rglob("*.json")}
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from main import generate_pages_recursive
+from manifest import BuildManifest, hash_file
+from site_index import PageRecord, SiteIndex
+
+
+def make_record(source: str, url: str, title: str = "Title") -> PageRecord:
+    return PageRecord(source, url, title, "0" * 64, 3, ["/"], [], 1, {})
+
+
+class TestSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load(self):
+        index = SiteIndex(self.root / "index.jsonl")
+        index.update(make_record("blog/post.md", "/blog/post.html"))
+        index.update(make_record("index.md", "/"))
+        index.save()
+        self.assertEqual(index.changed, set())
+
+        loaded = SiteIndex(self.root / "index.jsonl")
+        self.assertEqual([record.url for record in loaded.pages()], ["/", "/blog/post.html"])
+        self.assertEqual(loaded.records["blog/post.md"], index.records["blog/post.md"])
+        self.assertEqual(loaded.records["blog/post.md"].section, "blog")
+
+    def test_changed_tracking(self):
+        index = SiteIndex(self.root / "index.jsonl")
+        index.update(make_record("a.md", "/a.html"))
+        index.update(make_record("b.md", "/b.html"))
+        index.save()
+        index.update(make_record("a.md", "/a.html"))
+        self.assertEqual(index.changed, set())
+        index.update(make_record("a.md", "/a.html", title="New"))
+        index.retain(["a.md"])
+        self.assertEqual(index.changed, {"a.md", "b.md"})
+        self.assertNotIn("b.md", index)
+
+    def test_invalid_file_loads_empty(self):
+        path = self.root / "index.jsonl"
+        path.write_text('{"version": 1}\n{"source": "a.md"}\n')
+        self.assertEqual(len(SiteIndex(path)), 0)
+
+    def test_build_updates_index(self):
+        content = self.root / "content"
+        (content / "blog").mkdir(parents=True)
+        (content / "index.md").write_text("# Home\n\nSee [the blog](/blog/) now")
+        (content / "blog" / "post.md").write_text("---\ndate: 2024-01-02\n---\n# Post\n\nText")
+        template = self.root / "template.html"
+        template.write_text("{{ Content }}")
+        dest = self.root / "public"
+        manifest_path = self.root / "manifest.json"
+
+        def build(index):
+            manifest = BuildManifest(manifest_path, hash_file(template))
+            generate_pages_recursive(content, template, dest, manifest, site_index=index)
+            manifest.save()
+
+        index = SiteIndex(self.root / "index.jsonl")
+        build(index)
+        home = index.records["index.md"]
+        self.assertEqual((home.url, home.title, home.words, home.links), ("/", "Home", 5, ["/blog/"]))
+        self.assertEqual(index.records["blog/post.md"].front_matter, {"date": "2024-01-02"})
+        index.save()
+
+        # A lost index is rebuilt even though the manifest says nothing changed.
+        (self.root / "index.jsonl").unlink()
+        index = SiteIndex(self.root / "index.jsonl")
+        build(index)
+        self.assertEqual(set(index.records), {"index.md", "blog/post.md"})
+
+        (content / "blog" / "post.md").unlink()
+        build(index)
+        self.assertEqual(set(index.records), {"index.md"})
+
+
+if __name__ == "__main__":
+    unittest.main()
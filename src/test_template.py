@@ -0,0 +1,51 @@
+import io
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.segments, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title> {{ Title }} </title>\n<article>{{ Content }}</article>")
+        html = template.render({"Title": "Home", "Content": "<p>Hi</p>"})
+        self.assertEqual(html, "<title> Home </title>\n<article><p>Hi</p></article>")
+
+    def test_render_repeated_placeholder(self):
+        template = Template("{{ Title }}|{{Title}}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home|Home")
+
+    def test_render_missing_value(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Footer }}")
+        self.assertEqual(template.render({"Title": "Home"}), "<h1>Home</h1>{{ Footer }}")
+
+    def test_values_are_not_rescanned(self):
+        template = Template("{{ Title }}{{ Content }}")
+        html = template.render({"Title": "{{ Content }}", "Content": "<p></p>"})
+        self.assertEqual(html, "{{ Content }}<p></p>")
+
+    def test_write_streams_nodes(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        stream = io.StringIO()
+        node = ParentNode("div", [LeafNode("p", "Hi")])
+        template.write(stream, {"Title": "Home", "Content": node})
+        self.assertEqual(stream.getvalue(), "<title>Home</title><div><p>Hi</p></div>")
+
+    def test_any_placeholder_name(self):
+        template = Template("{{ stream }}{{ values }}{{ self }}")
+        stream = io.StringIO()
+        template.write(stream, {"stream": "a", "values": "b", "self": "c"})
+        self.assertEqual(stream.getvalue(), "abc")
+
+    def test_no_placeholders(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
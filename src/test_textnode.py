@@ -1,5 +1,5 @@
 import unittest
-from textnode import TextNode
+from textnode import TextNode, TextType, text_type_bold
 
 
 class TestTextNode(unittest.TestCase):
@@ -53,5 +53,16 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", "bold2", "https://www.boot.dev2")
         self.assertNotEqual(node, node2)
 
+    def test_text_type_matches_string(self):
+        node = TextNode("This is a text node", text_type_bold)
+        node2 = TextNode("This is a text node", "bold")
+        self.assertEqual(node, node2)
+        self.assertIs(TextType("bold"), text_type_bold)
+        self.assertEqual(repr(node), "TextNode(This is a text node, bold, None)")
+
+    def test_slots(self):
+        node = TextNode("This is a text node", text_type_bold)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import watch
+from watch import changed_paths, refresh_snapshot, reload_stamp_name, snapshot, touch_reload_stamp
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "content" / "index.md").write_text("# Home")
+        (self.root / "content" / "blog" / "post.md").write_text("# Post")
+        (self.root / "template.html").write_text("{{ Content }}")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_snapshot(self):
+        mtimes = snapshot([self.root / "content", self.root / "template.html", self.root / "missing"])
+        self.assertEqual(
+            set(mtimes),
+            {
+                self.root / "content" / "index.md",
+                self.root / "content" / "blog" / "post.md",
+                self.root / "template.html",
+            },
+        )
+
+    def test_changed_paths(self):
+        before = {Path("a"): 1, Path("b"): 1, Path("c"): 1}
+        after = {Path("a"): 1, Path("b"): 2, Path("d"): 1}
+        self.assertEqual(changed_paths(before, after), {Path("b"), Path("c"), Path("d")})
+
+    def test_refresh_snapshot(self):
+        content = self.root / "content"
+        mtimes = snapshot([content])
+        post = content / "blog" / "post.md"
+        post.write_text("# Edited")
+        os.utime(post, ns=(0, 0))
+        (content / "drafts").mkdir()
+        (content / "drafts" / "a.md").write_text("# A")
+        (content / "index.md").unlink()
+        changed = refresh_snapshot(mtimes, {post, content / "drafts", content / "index.md"})
+        self.assertEqual(changed, {post, content / "drafts" / "a.md", content / "index.md"})
+        self.assertEqual(mtimes, snapshot([content]))
+
+        shutil.rmtree(content / "blog")
+        self.assertEqual(refresh_snapshot(mtimes, {content / "blog"}), {post})
+        self.assertEqual(mtimes, snapshot([content]))
+        self.assertEqual(refresh_snapshot(mtimes, {content / "drafts" / "a.md"}), set())
+
+    @unittest.skipIf(watch.Observer is None, "watchdog is not installed")
+    def test_watch_events(self):
+        content = self.root / "content"
+        template = self.root / "template.html"
+        reported = []
+        done = threading.Event()
+
+        def on_change(changed):
+            reported.append(changed)
+            done.set()
+            raise KeyboardInterrupt
+
+        def run():
+            try:
+                watch.watch([content, template], on_change, interval=0.05)
+            except KeyboardInterrupt:
+                pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        time.sleep(0.5)
+        (self.root / "unwatched.txt").write_text("")
+        template.write_text("<main>{{ Content }}</main>")
+        (content / "blog" / "new.md").write_text("# New")
+        self.assertTrue(done.wait(5))
+        thread.join(5)
+        self.assertEqual(reported[0], {template, content / "blog" / "new.md"})
+
+    def test_touch_reload_stamp(self):
+        touch_reload_stamp(self.root)
+        self.assertTrue((self.root / reload_stamp_name).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
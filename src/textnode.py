@@ -1,11 +1,33 @@
+from collections.abc import Callable
+from enum import Enum
 from htmlnode import LeafNode
 
-text_type_text = "text"
-text_type_bold = "bold"
-text_type_italic = "italic"
-text_type_code = "code"
-text_type_link = "link"
-text_type_image = "image"
+
+class TextType(str, Enum):
+    """
+    The inline formatting of a TextNode. Members are single shared objects
+    that still compare equal to their plain string names, e.g. "bold".
+    """
+
+    TEXT = "text"
+    BOLD = "bold"
+    ITALIC = "italic"
+    CODE = "code"
+    LINK = "link"
+    IMAGE = "image"
+
+    def __str__(self) -> str:
+        return self.value
+
+    __format__ = str.__format__
+
+
+text_type_text = TextType.TEXT
+text_type_bold = TextType.BOLD
+text_type_italic = TextType.ITALIC
+text_type_code = TextType.CODE
+text_type_link = TextType.LINK
+text_type_image = TextType.IMAGE
 
 class TextNode():
     '''
@@ -16,6 +38,8 @@ class TextNode():
         text_type (str): The type of text this node contains, which is just a string like "bold" or "italic"
         url (str, optional): The URL of the link or image, if the text is a link. Default to None if nothing is passed in.
     '''
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: str, url: str = None) -> None:
         self.text = text
         self.text_type = text_type
@@ -38,13 +62,18 @@ class TextNode():
         '''
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def text_node_to_html_node(
+    text_node: TextNode, image_props: Callable[[str], dict[str, str]] = None
+) -> LeafNode:
     '''
     Purpose: Converts a TextNode object into an equivalent representation suitable 
     for HTML rendering (assumed to be a LeafNode object).
 
     Parameters:
         text_node (TextNode): The input TextNode object.
+        image_props (Callable, optional): Looks up the extra attributes of an
+            image by its URL, such as width and height. Images get only src
+            and alt when it is not given.
     
     Returns:
         LeafNode: An object representing a leaf node in an HTML structure.
@@ -60,5 +89,7 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
     elif text_node.text_type == text_type_link:
         return LeafNode("a", text_node.text, href=text_node.url)
     elif text_node.text_type == text_type_image:
-        return LeafNode("img", "", src=text_node.url, alt=text_node.text)
+        if image_props is None:
+            return LeafNode("img", "", src=text_node.url, alt=text_node.text)
+        return LeafNode("img", "", src=text_node.url, alt=text_node.text, **image_props(text_node.url))
     raise ValueError("The TextNode has invalid text type")
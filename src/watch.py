@@ -0,0 +1,213 @@
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Without watchdog, changes are found by polling
+    FileSystemEventHandler = object
+    Observer = None
+
+# File in the output directory whose modification time tells the dev server
+# (server.py --live-reload) that a rebuild finished and clients should reload.
+reload_stamp_name = ".livereload"
+# A poll waits at least this many times as long as the previous scan took, so
+# polling a large tree does not keep a core busy.
+poll_backoff = 10
+
+
+def snapshot(roots: list[Path]) -> dict[Path, int]:
+    """
+    Records the modification time of every file under the given roots.
+
+    Args:
+        roots: Files or directories to scan. Missing roots are ignored.
+
+    Returns:
+        A mapping of file path to modification time in nanoseconds.
+    """
+    mtimes = {}
+    pending = [str(root) for root in roots]
+    while pending:
+        path = pending.pop()
+        try:
+            if os.path.isfile(path):
+                mtimes[Path(path)] = os.stat(path).st_mtime_ns
+                continue
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        mtimes[Path(entry.path)] = entry.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return mtimes
+
+
+def changed_paths(before: dict[Path, int], after: dict[Path, int]) -> set[Path]:
+    """
+    Compares two snapshots.
+
+    Args:
+        before: The earlier snapshot.
+        after: The later snapshot.
+
+    Returns:
+        The paths that were added, modified or removed between the snapshots.
+    """
+    changed = {path for path, mtime in after.items() if before.get(path) != mtime}
+    changed.update(path for path in before if path not in after)
+    return changed
+
+
+def refresh_snapshot(mtimes: dict[Path, int], paths: set[Path]) -> set[Path]:
+    """
+    Updates a snapshot for paths reported changed by filesystem events,
+    without scanning the rest of the tree. Files are stat-ed again and
+    directories rescanned, so files added or removed with a directory are
+    found too.
+
+    Args:
+        mtimes: The snapshot, as returned by snapshot, updated in place.
+        paths: Files or directories that may have changed.
+
+    Returns:
+        The files that were added, modified or removed.
+    """
+    changed = set()
+    for path in paths:
+        try:
+            path_stat = os.stat(path)
+        except FileNotFoundError:
+            path_stat = None
+        if path_stat is not None and stat.S_ISREG(path_stat.st_mode):
+            if mtimes.get(path) != path_stat.st_mtime_ns:
+                mtimes[path] = path_stat.st_mtime_ns
+                changed.add(path)
+            continue
+        if path_stat is None and path in mtimes:
+            del mtimes[path]
+            changed.add(path)
+            continue
+        # A directory, or a path that no longer exists: compare everything below it.
+        before = {known: mtime for known, mtime in mtimes.items() if known == path or known.is_relative_to(path)}
+        after = snapshot([path]) if path_stat is not None else {}
+        for removed in before.keys() - after.keys():
+            del mtimes[removed]
+        mtimes.update(after)
+        changed.update(changed_paths(before, after))
+    return changed
+
+
+def touch_reload_stamp(dest_dir_path: Path) -> None:
+    """
+    Updates the reload stamp in the output directory so live-reload clients
+    refresh.
+
+    Args:
+        dest_dir_path: The output directory served by the dev server.
+    """
+    stamp = Path(dest_dir_path) / reload_stamp_name
+    stamp.write_text(str(time.time_ns()))
+
+
+def watch(roots: list[Path], on_change, interval: float = 0.05) -> None:
+    """
+    Calls on_change with the set of changed paths whenever files under the
+    given roots are added, modified or removed. Runs until interrupted.
+
+    When watchdog is installed the roots are watched with filesystem events
+    (inotify on Linux), so only the reported paths are looked at. Otherwise
+    they are polled, backing off on trees that take long to scan.
+
+    Args:
+        roots: Files or directories to watch.
+        on_change: Callback receiving the set of changed paths.
+        interval: Seconds between polls, and how long events are collected
+            before on_change is called, so a burst of writes is one rebuild.
+    """
+    roots = [Path(root) for root in roots]
+    if Observer is not None:
+        _watch_events(roots, on_change, interval)
+    else:
+        _watch_polling(roots, on_change, interval)
+
+
+def _watch_polling(roots: list[Path], on_change, interval: float) -> None:
+    previous = snapshot(roots)
+    scan_time = 0.0
+    while True:
+        time.sleep(max(interval, scan_time * poll_backoff))
+        started = time.perf_counter()
+        current = snapshot(roots)
+        scan_time = time.perf_counter() - started
+        changed = changed_paths(previous, current)
+        previous = current
+        if changed:
+            on_change(changed)
+
+
+def _watch_events(roots: list[Path], on_change, interval: float) -> None:
+    collector = _EventCollector(roots)
+    observer = Observer()
+    for root in roots:
+        if root.is_dir():
+            observer.schedule(collector, str(root.absolute()), recursive=True)
+        elif root.exists():
+            # Files are watched through their directory.
+            observer.schedule(collector, str(root.absolute().parent), recursive=False)
+    mtimes = snapshot(roots)
+    observer.start()
+    try:
+        while True:
+            if not collector.pending.wait(timeout=1):
+                continue
+            time.sleep(interval)
+            changed = refresh_snapshot(mtimes, collector.take())
+            if changed:
+                on_change(changed)
+    finally:
+        observer.stop()
+        observer.join()
+
+
+class _EventCollector(FileSystemEventHandler):
+    """Gathers the paths of filesystem events under the watched roots, named
+    as they are below the roots as given, e.g. "content/index.md"."""
+
+    def __init__(self, roots: list[Path]) -> None:
+        super().__init__()
+        self.roots = [(root, root.absolute()) for root in roots]
+        self.paths = set()
+        self.pending = threading.Event()
+        self._lock = threading.Lock()
+
+    def on_any_event(self, event) -> None:
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        if event.is_directory and event.event_type == "modified":
+            # Entries added to or removed from a directory have their own events.
+            return
+        for event_path in (event.src_path, getattr(event, "dest_path", "")):
+            path = self._root_path(Path(os.fsdecode(event_path))) if event_path else None
+            if path is not None:
+                with self._lock:
+                    self.paths.add(path)
+                self.pending.set()
+
+    def _root_path(self, path: Path) -> Path:
+        for root, absolute_root in self.roots:
+            if path == absolute_root or path.is_relative_to(absolute_root):
+                return root / path.relative_to(absolute_root)
+        return None
+
+    def take(self) -> set[Path]:
+        with self._lock:
+            paths = self.paths
+            self.paths = set()
+            self.pending.clear()
+        return paths
@@ -0,0 +1,4 @@
+trap 'kill 0' EXIT
+python src/main.py || exit 1
+python src/main.py --watch &
+python server.py --dir public --live-reload